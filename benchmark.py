@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+"""Benchmark suite of the TSP Problem Solver methods.
+
+Runs every enabled method with every enabled neighborhood on seeded random
+instances and writes a JSON report. The instances and the runs are seeded,
+so reports of two commits could be diffed to see how a change affects the
+speed and the quality of the methods. Methods that don't use neighborhoods
+(see Method._uses_neighborhood) are run once per instance. Some pairs are
+too slow for large instances (e.g. a sweep of the full two-opt neighborhood
+could take longer than the time limit), so a run is terminated when it
+exceeds its time limit by the grace time.
+
+Each run is made in a separate process, like in the GUI. The report has
+the following values for each run:
+    final_cost: cost of the best found tour, or null if the run hasn't
+        found any tour
+    iterations, iterations_per_sec: iterations of the method main loop
+    nodes, nodes_per_sec: generated (evaluated) neighbor states
+    run_time: wall time of the run
+    time_to_target: time when the run found a tour that is not worse than
+        the target cost, or null; the target is the best final cost on the
+        instance increased by the target gap
+    message: message returned by the method
+    error: null if the run has finished in time, otherwise "Terminated" if
+        the run has exceeded its time limit and the grace time, or "Failed"
+        if its process has died
+
+The report also has the import profiles of the application modules (see
+methods/importtime.py) and the time to the first window of the GUI; they
+show how much the start of the application costs.
+
+Examples:
+    python benchmark.py --output before.json
+    python benchmark.py --sizes 100,1000 -t 2 -m SA -m Tabu --output after.json
+    python benchmark.py --output after.json --baseline before.json
+    python benchmark.py --sizes "" --startup-runs 10
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from multiprocessing import Process, Pipe
+from time import time
+
+import numpy
+from numpy.random import seed as random_seed, RandomState
+
+from solve import find_class
+from tsp_board import TspBoard
+from methods.registry import get_registry
+from methods.statrecord import StatRecord
+from methods.tsp.state import TspState
+
+# messages of the runs that haven't been finished by the method
+TERMINATED = "Terminated"
+FAILED = "Failed"
+
+_root_path = os.path.dirname(os.path.abspath(__file__))
+
+class BenchmarkProcess(Process):
+    """Process that runs one method for the benchmark
+
+    The process sends ("start", time) message before the run, the method
+    progress messages during the run and ("finish", message, stat, run_time)
+    message at the end.
+    """
+
+    def __init__(self, method, state, conn):
+        Process.__init__(self)
+        self.method = method
+        self.state = state.copy()
+        self.conn = conn
+
+    def run(self):
+        method = self.method
+        method.set_connection(self.conn)
+        # best states are timestamped by the parent process
+        method._send_interval = 0.01
+        stat = StatRecord()
+        start_time = time()
+        self.conn.send(("start", start_time))
+        result_state, message = method.run(self.state, stat)
+        run_time = time() - start_time
+        method.flush_messages()
+        self.conn.send(("finish", message, stat, run_time))
+
+def run_method(method, state, grace_time):
+    """Runs the method in a separate process and collects its progress
+
+    Args:
+        method: method object
+        state: initial state
+        grace_time: time (in seconds) to wait for the method after its time
+            limit; the process is terminated after that
+
+    Returns:
+        Tuple (message, stat, run_time, trace), where trace is a list of
+        (time, cost) pairs of the found best states.
+    """
+    parent_conn, child_conn = Pipe()
+    process = BenchmarkProcess(method, state, child_conn)
+    process.start()
+    start_time = time()
+    deadline = start_time + method._run_time_limit + grace_time
+    stat, message, run_time, trace = StatRecord(), TERMINATED, None, []
+    while time()<deadline:
+        if not parent_conn.poll(min(1.0, max(0, deadline - time()))):
+            if not process.is_alive() and not parent_conn.poll():
+                message = FAILED
+                break
+            continue
+        msg = parent_conn.recv()
+        if msg[0]=="start":
+            start_time = msg[1]
+        elif msg[0]=="best_state":
+            stat = msg[3]
+            trace.append((time() - start_time, msg[2]))
+        elif msg[0]=="finish":
+            message, stat, run_time = msg[1:4]
+            break
+    if process.is_alive():
+        process.terminate()
+    process.join()
+    if run_time is None:
+        run_time = time() - start_time
+    return message, stat, run_time, trace
+
+def benchmark_instance(board, instance, runs, args):
+    """Runs the method/neighborhood pairs on the instance
+
+    Args:
+        board: TspBoard object
+        instance: instance description
+        runs: list of (method class, neighborhood class or None) pairs
+        args: command-line arguments
+
+    Returns:
+        List of the results dictionaries
+    """
+    results, traces = [], []
+    distance = board.shared_distance_matrix()
+    for method_class, neighborhood_class in runs:
+        neighborhood = neighborhood_class() if neighborhood_class else None
+        method = method_class(neighborhood=neighborhood,
+                              time_limit=args.time_limit, args=[distance],
+                              options={'seed': args.seed})
+        # every run starts from the same tour
+        state = TspState(board.cities_num(), generator=RandomState(args.seed))
+        message, stat, run_time, trace = run_method(method, state, 
+                                                    args.grace_time)
+        cost = stat.solution_cost
+        if trace and trace[-1][1]<cost:
+            cost = trace[-1][1]
+        found = numpy.isfinite(cost)
+        finished = message not in (TERMINATED, FAILED)
+        results.append({
+            'instance': instance,
+            'cities_num': board.cities_num(),
+            'seed': args.seed,
+            'method': method_class.__name__,
+            'neighborhood': neighborhood_class and neighborhood_class.__name__,
+            'final_cost': round(float(cost), 3) if found else None,
+            'iterations': stat.overall_iterations,
+            'iterations_per_sec': round(stat.overall_iterations/run_time, 1),
+            'nodes': stat.overall_nodes_generated,
+            'nodes_per_sec': round(stat.overall_nodes_generated/run_time, 1),
+            'run_time': round(run_time, 3),
+            'message': message,
+            'error': None if found and finished else message})
+        traces.append(trace)
+        print >> sys.stderr, "%-10s %-26s %-24s %14.3f %12.1f it/s" % (
+            instance, method_class.__name__, results[-1]['neighborhood'] or '-',
+            cost, results[-1]['iterations_per_sec'])
+
+    costs = [result['final_cost'] for result in results 
+             if result['final_cost'] is not None]
+    target = min(costs)*(1 + args.target_gap) if costs else None
+    for result, trace in zip(results, traces):
+        result['time_to_target'] = None
+        for found_time, cost in trace:
+            if target is not None and cost<=target:
+                result['time_to_target'] = round(found_time, 3)
+                break
+    return results
+
+def import_profile(module_name, slowest_num=15):
+    """Profiles the import of the module in a fresh interpreter
+
+    Args:
+        module_name: name of the module
+        slowest_num: number of the slowest modules in the profile
+
+    Returns:
+        Dictionary with the total import time, the names of all the loaded
+        modules, the slowest modules by their cumulative time and the import
+        error if the module could not be imported.
+    """
+    process = subprocess.Popen([sys.executable, '-m', 'methods.importtime',
+                                '--json', module_name],
+                               cwd=_root_path, stdout=subprocess.PIPE)
+    report = json.loads(process.communicate()[0])
+    records = report['records']
+    slowest = sorted(records, key=lambda record: -record[2])[:slowest_num]
+    return {'total_ms': round(report['total_us']/1000.0, 1),
+            'error': report['error'],
+            'modules': sorted(record[0] for record in records),
+            'slowest': [{'module': name, 'self_ms': round(self_time/1000.0, 1),
+                         'cumulative_ms': round(cumulative/1000.0, 1)}
+                        for name, self_time, cumulative, depth in slowest]}
+
+def startup_time(runs):
+    """Measures time from the start of the GUI to its first window
+
+    The GUI quits as soon as its window is shown (see TSP_EXIT_ON_SHOW in
+    main.py), so the time includes the interpreter start and exit.
+
+    Args:
+        runs: number of the starts; the median time is reported
+
+    Returns:
+        Dictionary with the median time or with the error message
+    """
+    env = dict(os.environ, TSP_EXIT_ON_SHOW='1')
+    times = []
+    with open(os.devnull, 'w') as devnull:
+        for index in range(runs):
+            start_time = time()
+            code = subprocess.call([sys.executable, 'main.py'], cwd=_root_path,
+                                   env=env, stdout=devnull, stderr=devnull)
+            if code:
+                return {'runs': runs, 'time_to_window_ms': None,
+                        'error': "main.py exited with code %d" % code}
+            times.append(time() - start_time)
+    return {'runs': runs, 'error': None,
+            'time_to_window_ms': round(1000*sorted(times)[runs//2], 1)}
+
+def git_revision():
+    """Returns the current git commit of the sources or None"""
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                           stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report, baseline):
+    """Prints relative changes of the report against the baseline report"""
+    keys = lambda result: (result['instance'], result['method'],
+                           result['neighborhood'])
+    old_results = dict((keys(result), result) for result in baseline['results'])
+    print >> sys.stderr, "%-10s %-26s %-24s %8s %10s" % (
+        "instance", "method", "neighborhood", "cost", "nodes/s")
+    for result in report['results']:
+        old = old_results.get(keys(result))
+        if old is None:
+            continue
+        ratio = lambda name: (old[name] and result[name] is not None and
+                              "%+.1f%%" % (100.0*result[name]/old[name] - 100) or "-")
+        print >> sys.stderr, "%-10s %-26s %-24s %8s %10s" % (
+            result['instance'], result['method'], result['neighborhood'] or '-',
+            ratio('final_cost'), ratio('nodes_per_sec'))
+    for name in sorted(report['imports']):
+        if baseline.get('imports', {}).has_key(name):
+            print >> sys.stderr, "import %s: %.1f ms -> %.1f ms" % (
+                name, baseline['imports'][name]['total_ms'],
+                report['imports'][name]['total_ms'])
+    old_startup = baseline.get('startup', {}).get('time_to_window_ms')
+    if old_startup and report['startup'].get('time_to_window_ms'):
+        print >> sys.stderr, "time to window: %.1f ms -> %.1f ms" % (
+            old_startup, report['startup']['time_to_window_ms'])
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the TSP Problem Solver methods on random instances.")
+    parser.add_argument('--sizes', default='100,1000,5000',
+                        help="comma separated numbers of cities of the instances "
+                        "(default: 100,1000,5000); empty to skip the methods")
+    parser.add_argument('--instance-seed', type=int, default=1,
+                        help="random seed of the instances (default: 1)")
+    parser.add_argument('-s', '--seed', type=int, default=1,
+                        help="random seed of the runs (default: 1)")
+    parser.add_argument('-t', '--time-limit', type=float, default=5,
+                        help="run time limit in seconds (default: 5)")
+    parser.add_argument('--grace-time', type=float, default=10,
+                        help="time to wait for a method after its time limit "
+                        "(default: 10)")
+    parser.add_argument('-m', '--method', action='append', default=[],
+                        help="method class name or short name; could be "
+                        "repeated (default: all methods)")
+    parser.add_argument('-n', '--neighborhood', action='append', default=[],
+                        help="neighborhood class name or short name; could be "
+                        "repeated (default: all neighborhoods)")
+    parser.add_argument('--target-gap', type=float, default=0.05,
+                        help="relative gap of the time-to-target cost from the "
+                        "best final cost (default: 0.05)")
+    parser.add_argument('--import-profile', default='main,solve',
+                        help="comma separated modules to profile the imports "
+                        "of (default: main,solve)")
+    parser.add_argument('--startup-runs', type=int, default=3,
+                        help="number of the GUI starts to measure the time to "
+                        "the first window; 0 to skip (default: 3)")
+    parser.add_argument('--output', default='-',
+                        help="JSON report file (default: stdout)")
+    parser.add_argument('--baseline',
+                        help="JSON report to compare the results with")
+    return parser.parse_args(args)
+
+def benchmark(args):
+    """Runs the benchmark that is described by the command-line arguments
+
+    Returns:
+        Dictionary with the report
+    """
+    registry = get_registry()
+    methods = registry.methods(enabled_only=True)
+    neighborhoods = registry.neighborhoods()
+    if args.method:
+        methods = [find_class(methods, name, "method") for name in args.method]
+    else:
+        methods = [info.load() for info in methods]
+    if args.neighborhood:
+        neighborhoods = [find_class(neighborhoods, name, "neighborhood")
+                         for name in args.neighborhood]
+    else:
+        neighborhoods = [info.load() for info in neighborhoods]
+    runs = []
+    for method_class in methods:
+        if method_class._uses_neighborhood:
+            runs += [(method_class, neighborhood) for neighborhood in neighborhoods]
+        else:
+            runs.append((method_class, None))
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = []
+    for size in sizes:
+        random_seed(args.instance_seed)
+        board = TspBoard(use_cache=False)
+        board.random(size)
+        instance = "random-%d" % size
+        results += benchmark_instance(board, instance, runs, args)
+    imports = dict((name, import_profile(name))
+                   for name in args.import_profile.split(',') if name)
+    startup = startup_time(args.startup_runs) if args.startup_runs>0 else {}
+    return {'meta': {'python': platform.python_version(),
+                     'numpy': numpy.__version__,
+                     'platform': platform.platform(),
+                     'revision': git_revision(),
+                     'sizes': sizes,
+                     'instance_seed': args.instance_seed,
+                     'seed': args.seed,
+                     'time_limit': args.time_limit,
+                     'target_gap': args.target_gap},
+            'results': results,
+            'imports': imports,
+            'startup': startup}
+
+def main(args=None):
+    args = parse_args(args)
+    report = benchmark(args)
+    if args.output=='-':
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -44,46 +44,70 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from main_window import Ui_MainWindow
-from main_options import Ui_main_options
-from tsp_random_options import Ui_tsp_random_options
-
-from tsp_board import TspBoard
 
 from methods.statrecord import StatRecord
-from methods.tsp.state import TspState
+from methods.pipes import wait
 
 import sys
-import inspect
 import time
 import os
-from os.path import isfile, join, split
-from importlib import import_module
-from multiprocessing import Process, Pipe
-from numpy import average
+from os.path import split
+from functools import partial
+from multiprocessing import Process, Pipe, cpu_count
 from PyQt4 import QtCore, QtGui
 
+# Only the modules that the main window needs are imported here. NumPy, the 
+# problem board and states, the dialogs, the methods registry and the method 
+# modules are imported on first use, so the window is shown sooner (see "python benchmark.py 
+# --startup-runs" and "python -m methods.importtime main").
+
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 class AsyncRunProcess(Process):
-    """Class that implements methods running in a separate process"""
+    """Class that implements methods running in a separate process
+    
+    If seed is set then it is used as the random seed of the method run, so 
+    parallel starts of the method don't repeat each other. If randomize is 
+    True then the process starts from a random state that is shuffled with 
+    the same seed, so the start could be repeated.
+    """
         
-    def __init__(self, obj, state, conn):
+    def __init__(self, obj, state, conn, seed=None, randomize=False):
         Process.__init__(self)
         self.obj = obj
         self.state = state.copy()
         self.conn = conn
+        self.seed = seed
+        self.randomize = randomize
 #        print "Calculation process initialized"
     def run(self):
+        from numpy.random import RandomState
+        if self.seed is not None:
+            self.obj._seed = self.seed
+        if self.randomize:
+            self.state.randomize(RandomState(self.seed))
         stat = StatRecord()
         self.obj.set_connection(self.conn)
         result_state, msg = self.obj.run(self.state, stat)
 #        print result_state.to_string(), msg, self.state._state
+        self.obj.flush_messages()
         self.conn.send(("finish",result_state, msg, stat))
 #        self.conn.close()
         
 class AsyncRun(QtCore.QObject):
-    """Class that runs method instance for a problem asynchronously"""
+    """Class that runs method instance for a problem asynchronously
+    
+    If option 'starts' is greater than one then the method is started in 
+    several processes at once (multi-start mode). Each process has its own 
+    random seed and all of them except the first one start from a random 
+    state. The best state among all the processes is reported.
+    
+    Messages are received as soon as they come: the run waits for the pipes 
+    with methods.pipes.wait function. The wait is limited by _wait_timeout 
+    seconds, so a stop request is noticed in that time.
+    """
     stop = False
+    _wait_timeout = 0.1
     def __init__(self, obj, state, options={}):
         QtCore.QObject.__init__(self)
         self.obj = obj
@@ -97,20 +121,39 @@ class AsyncRun(QtCore.QObject):
             self.options['cost_avg_num'] = 10
         if not self.options.has_key('runtime_best_state'):
             self.options['runtime_best_state'] = False
+        if not self.options.has_key('starts'):
+            self.options['starts'] = 1
         
     def run(self):
-        print self.obj.name() + " starts"
+        from numpy import average
+        from numpy.random import RandomState
+        starts = max(1, self.options['starts'])
+        if starts>1:
+            print self.obj.name() + " starts in %d processes" % starts
+        else:
+            print self.obj.name() + " starts"
         
-        parent_conn, child_conn = Pipe()
-        stat = StatRecord()
-        self.process = AsyncRunProcess(self.obj, self.state, child_conn)
+        connections, self.processes = [], []
+        # seeds of the starts are derived from the method seed if it is set
+        seeds = RandomState(self.obj._seed).randint(1<<31, size=starts)
+        for index in range(starts):
+            parent_conn, child_conn = Pipe()
+            seed = int(seeds[index]) if starts>1 else None
+            process = AsyncRunProcess(self.obj, self.state, child_conn, seed, 
+                                      randomize=index>0)
+            connections.append(parent_conn)
+            self.processes.append(process)
 #        print "Starting calculation process..."
-        self.process.start()
+        for process in self.processes:
+            process.start()
+        results = {}
         av_cost, av_cost_len, best_cost = [], 0, float('inf')
         best_solution_value, best_state, best_stat = float('inf'), self.state.copy(), StatRecord()
         while not self.stop:
-            if parent_conn.poll():
-                while parent_conn.poll() and not self.stop:
+            active = [conn for index, conn in enumerate(connections) if not results.has_key(index)]
+            for parent_conn in wait(active, self._wait_timeout):
+                index = connections.index(parent_conn)
+                while not results.has_key(index) and parent_conn.poll() and not self.stop:
                     msg = parent_conn.recv()
                     if msg[0]=="cost" and self.options['runtime_cost']:
 #                        print msg[1]
@@ -123,46 +166,50 @@ class AsyncRun(QtCore.QObject):
                         if av_cost_len==self.options['cost_avg_num']:
                             self.emit(QtCore.SIGNAL("display_value"), average(av_cost), best_cost)
                             av_cost, av_cost_len = [], 0
-                            time.sleep(0.01)
                     if msg[0]=="state" and self.options['runtime_state']:
-                        state, value = msg[1:]
-#                        if :
-#                            if best_solution_value>value:
-#                                best_solution_value = value
-#                                self.emit(QtCore.SIGNAL("display_state"), state, value)
-#                                time.sleep(0.01)
-#                        else:
+                        state, value = self.state.unpack(msg[1]), msg[2]
                         self.emit(QtCore.SIGNAL("display_state"), state, value)
-                        time.sleep(0.01)
-                    if msg[0]=="best_state":
-                        best_state, best_solution_value, best_stat = msg[1:]
+                    if msg[0]=="best_state" and msg[2]<best_solution_value:
+                        best_solution_value, best_stat = msg[2:]
+                        best_state = self.state.unpack(msg[1])
                         if self.options['runtime_best_state']:
                             self.emit(QtCore.SIGNAL("display_state"), best_state, best_solution_value)
-                            time.sleep(0.01)
                     if msg[0]=="finish":
-                        state, msg, stat = msg[1:]
-                        print "Calculation finished"
-#                        print msg, state.to_string()
-                        self.process.join()
-                        self.emit(QtCore.SIGNAL("success"), state, msg, stat)
-                        time.sleep(1)
-                        self.emit(QtCore.SIGNAL("finished"))
-                        return
-            else:
-                time.sleep(0.1)
+                        results[index] = msg[1:]
+                        self.processes[index].join()
+            if len(results)==starts:
+                state, msg, stat = self.best_result(results.values())
+                print "Calculation finished"
+#                print msg, state.to_string()
+                self.emit(QtCore.SIGNAL("success"), state, msg, stat)
+                time.sleep(1)
+                self.emit(QtCore.SIGNAL("finished"))
+                return
         if self.stop:
             print "Stop the run object"#, best_state.to_string()
             self.emit(QtCore.SIGNAL("success"), best_state, "Stopped on demand", best_stat)
             time.sleep(1)
-            self.process.terminate()
-            self.process.join()
-#        elif parent_conn.poll():
-#            state, msg, stat = parent_conn.recv()
-#            print "Calculation finished"
-#            print msg, state.to_string()
-#            self.process.join()
-#            self.emit(QtCore.SIGNAL("success"), state, msg, stat)
+            for process in self.processes:
+                process.terminate()
+                process.join()
         self.emit(QtCore.SIGNAL("finished"))
+        
+    def best_result(self, results):
+        """Returns the best of the results of parallel starts
+        
+        Args:
+            results: list of tuples (state, message, stat)
+            
+        Returns:
+            Tuple (state, message, stat) with the least solution cost. Its 
+            statistics record counts nodes and iterations of all the starts.
+        """
+        state, msg, stat = min(results, key=lambda result: result[2].solution_cost)
+        if len(results)>1:
+            stat.overall_nodes_generated = sum([result[2].overall_nodes_generated for result in results])
+            stat.overall_iterations = sum([result[2].overall_iterations for result in results])
+            msg = "%s (best of %d starts)" % (msg, len(results))
+        return state, msg, stat
     
     def stopWork(self):
         print "Calculation terminated"
@@ -171,6 +218,7 @@ class AsyncRun(QtCore.QObject):
 class MainOptionsDlg(QtGui.QDialog):
     """Envelope-class for main options dialog"""
     def __init__(self, parent=None):
+        from main_options import Ui_main_options
         QtGui.QDialog.__init__(self, parent)
         self.ui = Ui_main_options()
         self.ui.setupUi(self)
@@ -184,6 +232,7 @@ class MainOptionsDlg(QtGui.QDialog):
 class TSPRandomOptionsDlg(QtGui.QDialog):
     """Envelope-class for TSP random generating dialog"""
     def __init__(self, parent=None):
+        from tsp_random_options import Ui_tsp_random_options
         QtGui.QDialog.__init__(self, parent)
         self.ui = Ui_tsp_random_options()
         self.ui.setupUi(self)
@@ -196,7 +245,6 @@ class MainWindow(QtGui.QMainWindow):
     Shows the main window and runs methods for the problems.
     
     Attributes:
-        _method_path: path to methods module
         _method_modules: list of loaded methods for a current problem
         _method_types: list of loaded method types
         _neighborhoods: list of loaded heighborhood modules
@@ -210,6 +258,12 @@ class MainWindow(QtGui.QMainWindow):
         _board_data: data used to display board
         _statistics: list of all statistic records
         _run_queue: queue of problem tasks
+        _runs: running tasks; dictionary of tuples (thread, AsyncRun object, 
+            method title, processor cores of the task) by the task numbers. 
+            The tasks are started while their cores fit the available ones 
+            (see task_cores function).
+        _run_counter: number of the tasks started since the application start
+        _finished_tasks_num: number of the finished tasks of the current run
         _has_solution: flag to know if there solution was found
         _is_displaying_runtime: 
         _is_displaying_runtime_state:
@@ -220,12 +274,10 @@ class MainWindow(QtGui.QMainWindow):
         _chart_prev_best_value: currently best cost value
         tsp_cities_num: number of cities in TSP problem
         tsp_filename: TSP file name
-        tsp_board: TspBoard object
-        run_thread: object of a thread that runs a searching method
-        run_object: object of class AsyncRun
+        tsp_board: TspBoard object; it's created on first use, so NumPy is 
+            not imported before the window is shown
     """
     
-    _method_path = 'methods'
     _method_modules = {}
     _method_types = []
     _neighborhoods = {}
@@ -241,12 +293,15 @@ class MainWindow(QtGui.QMainWindow):
     
     _statistics = []
     _run_queue = []
+    _runs = {}
+    _run_counter = 0
+    _finished_tasks_num = 0
     _has_solution = False
     _is_displaying_runtime = False
     _is_displaying_runtime_state = False
     
     main_options = {'runtime_chart':True, 'runtime_solution':False, 
-                    'avg_solution':1, 'runtime_best':False}
+                    'avg_solution':1, 'runtime_best':False, 'starts':1}
     
     _chart_max_value = 0
     _chart_min_value = float('inf')
@@ -257,10 +312,7 @@ class MainWindow(QtGui.QMainWindow):
     # TSP
     tsp_cities_num = 4
     tsp_filename = ""
-    tsp_board = TspBoard()
-    
-    run_thread = None
-    run_object = None
+    _tsp_board = None
     
     def __init__(self, parent=None):
         QtGui.QWidget.__init__(self, parent)
@@ -317,6 +369,14 @@ class MainWindow(QtGui.QMainWindow):
         
         self.ui.tab_widget.setCurrentIndex(0)
 
+    @property
+    def tsp_board(self):
+        """Returns TspBoard object of the TSP problem"""
+        if self._tsp_board is None:
+            from tsp_board import TspBoard
+            self._tsp_board = TspBoard()
+        return self._tsp_board
+
     def process_resize(self, event):
         """Processes a window resize event"""
         sr = self.ui.runtime_chart.sceneRect()
@@ -342,11 +402,14 @@ class MainWindow(QtGui.QMainWindow):
         dialog.ui.avg_solution.setValue(self.main_options['avg_solution'])
         dialog.ui.avg_solution.setEnabled(self.main_options['runtime_chart'])
         dialog.ui.avg_solution_label.setEnabled(self.main_options['runtime_chart'])
+        dialog.ui.starts.setMaximum(cpu_count())
+        dialog.ui.starts.setValue(self.main_options['starts'])
         if dialog.exec_():
             self.main_options['runtime_chart'] = dialog.ui.runtime_chart.checkState()==QtCore.Qt.Checked
             self.main_options['runtime_solution'] = dialog.ui.runtime_solution.checkState()==QtCore.Qt.Checked
             self.main_options['runtime_best'] = dialog.ui.runtime_best.checkState()==QtCore.Qt.Checked
             self.main_options['avg_solution'] = dialog.ui.avg_solution.value()
+            self.main_options['starts'] = dialog.ui.starts.value()
             self.ui.tab_widget.setTabEnabled(1, self.main_options['runtime_chart'])
             return True
         return False
@@ -363,18 +426,14 @@ class MainWindow(QtGui.QMainWindow):
     def update_method_lists(self, reload_modules=True):
         """Loads methods, heuristics, and neighborhoods
         
+        The classes are taken from the registry of the current problem (see 
+        methods/registry.py), so the modules are scanned only when they are 
+        changed. A method module is imported when the method is run.
+        
         Args:
-            reload_modules
+            reload_modules: if True then the lists are filled again
         """
-        
-        def is_subclass(class_obj, parent_class_name, strictly=True):
-            if strictly and class_obj.__name__==parent_class_name:
-                return False
-            for cl in inspect.getmro(class_obj):
-                if cl.__name__==parent_class_name:
-                    return True
-            return False
-            
+        from methods.registry import get_registry
         self.ui.run_groupbox.setEnabled(True)
             
         if reload_modules:
@@ -387,51 +446,42 @@ class MainWindow(QtGui.QMainWindow):
             root.setExpanded(True)
             self._method_types = []
             
-            method_path = self._method_path + os.sep + self._current_problem
-            method_files = [ f for f in os.listdir(method_path) if isfile(join(method_path,f)) and f.endswith('.py') ]
-            sys.path.append(join(sys.path[0], method_path))
-            
+            registry = get_registry(self._current_problem)
             self._method_modules = {}
             self._neighborhoods = {}
-            for method_file in method_files:
-                module_name = 'methods.'+self._current_problem+'.'+method_file.replace('.py','')
-                import_module(module_name)
-                for name, obj in inspect.getmembers(sys.modules[module_name]):
-                    # method
-                    if inspect.isclass(obj) and is_subclass(obj,"BasicMethod"):
-                        if not obj._type in self._method_types:
-                            self._method_types.append(obj._type)
-                            root.addChild(QtGui.QTreeWidgetItem([obj._type]))
-                            child = root.child(root.childCount()-1)
-                            child.setCheckState(0, QtCore.Qt.Unchecked)
-                            child.setExpanded(True)
-                            font = child.font(0)
-                            font.setBold(True)
-                            child.setFont(0, font)
-                            child.setFlags(root.flags().__or__(QtCore.Qt.ItemIsTristate))
-                        
-                        if not obj._disabled:
-                            self._method_modules[obj.__name__] = {'file':method_file, 'type':obj._type, 'class':obj, 'title':obj._name, 'short_title':obj._short_name, 'module':module_name}
-                        parent = self.ui.methods_tree.findItems(obj._type, QtCore.Qt.MatchFlags(QtCore.Qt.MatchFixedString + QtCore.Qt.MatchRecursive))
-                        if parent:
-                            parent = parent[0]
-                            parent.addChild(QtGui.QTreeWidgetItem([obj._name]))
-                            child = parent.child(parent.childCount()-1)
-                            child.setCheckState(0, QtCore.Qt.Unchecked)
-                            child.setData(1, QtCore.Qt.UserRole, obj.__name__)
-                            if obj._disabled:
-                                child.setDisabled(True)
+            for info in registry.methods():
+                if not info.type in self._method_types:
+                    self._method_types.append(info.type)
+                    root.addChild(QtGui.QTreeWidgetItem([info.type]))
+                    child = root.child(root.childCount()-1)
+                    child.setCheckState(0, QtCore.Qt.Unchecked)
+                    child.setExpanded(True)
+                    font = child.font(0)
+                    font.setBold(True)
+                    child.setFont(0, font)
+                    child.setFlags(root.flags().__or__(QtCore.Qt.ItemIsTristate))
+                
+                if not info.disabled:
+                    self._method_modules[info.name] = {'file':info.file, 'type':info.type, 'info':info, 'title':info.title, 'short_title':info.short_title, 'module':info.module}
+                parent = self.ui.methods_tree.findItems(info.type, QtCore.Qt.MatchFlags(QtCore.Qt.MatchFixedString + QtCore.Qt.MatchRecursive))
+                if parent:
+                    parent = parent[0]
+                    parent.addChild(QtGui.QTreeWidgetItem([info.title]))
+                    child = parent.child(parent.childCount()-1)
+                    child.setCheckState(0, QtCore.Qt.Unchecked)
+                    child.setData(1, QtCore.Qt.UserRole, info.name)
+                    if info.disabled:
+                        child.setDisabled(True)
 
-                    # neighborhood
-                    if inspect.isclass(obj) and is_subclass(obj,"BasicNeighborhood") and not obj._disabled:
-                        self._neighborhoods[obj.__name__] = {'file':method_file, 'module':module_name, 'class':obj, 'title':obj._name, 'short_title':obj._short_name}
-                        self.ui.neighborhood_list.addItem(obj._name)
-                        item = self.ui.neighborhood_list.item(self.ui.neighborhood_list.count()-1)
-                        item.setData(QtCore.Qt.UserRole, obj.__name__)
-                        if obj._default:
-                            item.setCheckState(QtCore.Qt.Checked)
-                        else:
-                            item.setCheckState(QtCore.Qt.Unchecked)
+            for info in registry.neighborhoods():
+                self._neighborhoods[info.name] = {'file':info.file, 'module':info.module, 'info':info, 'title':info.title, 'short_title':info.short_title}
+                self.ui.neighborhood_list.addItem(info.title)
+                item = self.ui.neighborhood_list.item(self.ui.neighborhood_list.count()-1)
+                item.setData(QtCore.Qt.UserRole, info.name)
+                if info.default:
+                    item.setCheckState(QtCore.Qt.Checked)
+                else:
+                    item.setCheckState(QtCore.Qt.Unchecked)
     
     def popup_tsp_random_options_dlg(self):
         """Pop-ups a TSP options dialog"""
@@ -499,10 +549,11 @@ class MainWindow(QtGui.QMainWindow):
         self.ui.board.repaint()
         self.enable_window_items(enable=False)
     
-    def after_run(self, result_state=None, msg="", stat=StatRecord()):
+    def after_run(self, run_id, result_state=None, msg="", stat=StatRecord()):
         """Function that runs after a solving method
         
         Args:
+            run_id: number of the finished task
             result_state: found state
             msg: string that will be displayed in a status bar
             stat: statistics, type StatRecord
@@ -511,16 +562,10 @@ class MainWindow(QtGui.QMainWindow):
             print "After run", result_state.to_string(), msg
         else:
             print "After run with no params"
-        self.run_thread.wait()
-        del self.run_thread
-        self.run_thread = None
-        del self.run_object
-        self.run_object = None
-    
-        self.run_timer.stop()
-        del self.elapsed_timer
-        self.ui.statusbar.removeWidget(self.timer_widget)
-        self.ui.statusbar.showMessage(msg, 1000*60)
+        run_thread, run_object, method_title, cores = self._runs.pop(run_id)
+        run_thread.wait()
+        del run_thread, run_object
+        self._finished_tasks_num += 1
         
         if result_state:
             self._has_solution = True
@@ -528,16 +573,29 @@ class MainWindow(QtGui.QMainWindow):
             self.display_board(self._current_state)
             self.add_statistics(stat, result_state.copy())
         
-        if self._run_queue:
-            time.sleep(1)
-        if self.process_run_queue():
+        self.process_run_queue()
+        if self._runs:
+            self.show_run_progress()
             return
         
+        self.run_timer.stop()
+        del self.elapsed_timer
+        self.ui.statusbar.removeWidget(self.timer_widget)
+        self.ui.statusbar.showMessage(msg, 1000*60)
         self.ui.board.setForegroundBrush(QtGui.QBrush(QtCore.Qt.lightGray,QtCore.Qt.NoBrush))
         self.ui.board.repaint()
         self.ui.tab_widget.setCurrentIndex(0)
         self.enable_window_items()
         
+    def show_run_progress(self):
+        """Shows progress of the parallel tasks in a status bar"""
+        running = [self._runs[run_id][2] for run_id in sorted(self._runs)]
+        tasks_num = self._finished_tasks_num + len(running) + len(self._run_queue)
+        msg = 'Run %s: %d of %d tasks finished, running %s' % (
+            self._current_problem_title, self._finished_tasks_num, tasks_num, 
+            ', '.join(running))
+        self.ui.statusbar.showMessage(msg)
+        
     def _process_new_tsp_problem(self, problem_title, problem_short_title):
         """Runs after new problem is randomly created or loaded
         
@@ -545,6 +603,7 @@ class MainWindow(QtGui.QMainWindow):
             problem_title: 
             problem_short_title:
         """
+        from methods.tsp.state import TspState
         self._original_state = TspState(self.tsp_board.cities_num())
         self._current_state = self._original_state
         self._current_problem = "tsp"
@@ -710,28 +769,59 @@ class MainWindow(QtGui.QMainWindow):
         
     def stop(self):
         """Stops method running"""
-        if self.run_thread:
+        if self._runs:
 #            print "Begin termination..."
             self._run_queue = []
-#            print "Run after_run"
-#            self.after_run()
-            self.run_object.emit(QtCore.SIGNAL("finished"))
+            for run_thread, run_object, method_title, cores in self._runs.values():
+                run_object.emit(QtCore.SIGNAL("finished"))
 #            print "After run completed"
     
+    def task_cores(self, method):
+        """Returns how many processor cores a task of the method takes
+        
+        Each parallel start of a method takes a core, and a method that runs 
+        its own processes (e.g. island simulated annealing) takes all the 
+        cores at each start.
+        """
+        cores = self.main_options['starts']
+        if self._method_modules[method]['info'].uses_processes:
+            cores *= cpu_count()
+        return cores
+    
+    def can_start_task(self, method):
+        """Checks if a task of the method fits the free processor cores
+        
+        A task is always started if no other task is running.
+        """
+        used_cores = sum(run[3] for run in self._runs.values())
+        return (not self._runs or 
+                used_cores + self.task_cores(method)<=cpu_count())
+    
     def process_run_queue(self):
-        """Process a queue of the problem tasks"""
-        if not self._run_queue:
-            return False
-            
-        method, neighborhood, self._current_state = self._run_queue.pop(0)
-        print 'Next task:', self._current_problem, method
-        self.before_run(problem_title=self._current_problem_title, method_title=self._method_modules[method]['title'])
-        self.async_run(method, neighborhood)
-        return True
+        """Process a queue of the problem tasks
+        
+        Starts the tasks from the queue until the run pool is full.
+        
+        Returns:
+            True if any task has been started
+        """
+        started = False
+        while self._run_queue and self.can_start_task(self._run_queue[0][0]):
+            method, neighborhood, state = self._run_queue.pop(0)
+            print 'Next task:', self._current_problem, method
+            method_title = self._method_modules[method]['title']
+            if not self._runs and not started:
+                self._finished_tasks_num = 0
+                self.before_run(problem_title=self._current_problem_title, method_title=method_title)
+            self.async_run(method, neighborhood, state)
+            started = True
+        if started and len(self._runs)>1:
+            self.show_run_progress()
+        return started
     
     def run_once(self):
         """Runs currently selected method for the problem"""
-        if self.run_thread:
+        if self._runs:
             return self.stop()
             
         items = self.ui.methods_tree.selectedItems()
@@ -751,7 +841,7 @@ class MainWindow(QtGui.QMainWindow):
     
     def run_checked_methods(self):
         """Runs checked methods for the problem"""
-        if self.run_thread:
+        if self._runs:
             return self.stop()
             
         methods = self.get_checked_methods()
@@ -767,7 +857,7 @@ class MainWindow(QtGui.QMainWindow):
     
     def run_all_variants(self):
         """Runs all possible variants of methods"""
-        if self.run_thread:
+        if self._runs:
             return self.stop()
         
         neighborhood = self.get_checked_neighborhoods()
@@ -781,38 +871,55 @@ class MainWindow(QtGui.QMainWindow):
                 self._run_queue.append((method, neighborhood, self._current_state.copy()))
         self.process_run_queue()
             
-    def async_run(self, method, neighborhoods):
+    def async_run(self, method, neighborhoods, state):
         """Makes an asynchronous run of the method
 
         Args:
             method: name of the method to run
             neighborhoods: list of the neighborhood's names
+            state: initial state
         """
         neighborhood_classes = []
         for neighborhood in neighborhoods:
-            neighborhood_classes.append(self._neighborhoods[neighborhood]['class']())
-        obj = self._method_modules[method]['class'](neighborhood=neighborhood_classes, time_limit=self.ui.time_limit.value(), args=self.get_problem_args())
+            neighborhood_classes.append(self._neighborhoods[neighborhood]['info'].load()())
+        method_class = self._method_modules[method]['info'].load()
+        obj = method_class(neighborhood=neighborhood_classes, time_limit=self.ui.time_limit.value(), args=self.get_problem_args())
         run_options = {'runtime_cost': self.main_options['runtime_chart'],
                        'runtime_state': self.main_options['runtime_solution'],
                        'cost_avg_num': self.main_options['avg_solution'],
-                       'runtime_best_state': self.main_options['runtime_best']}
-        self.run_object = AsyncRun(obj, self._current_state, run_options)
-        self.run_thread = QtCore.QThread()
-        QtCore.QObject.connect(self.run_thread, QtCore.SIGNAL("started()"), self.run_object.run, QtCore.Qt.DirectConnection);
-        QtCore.QObject.connect(self.run_thread, QtCore.SIGNAL("finished()"), self.run_object.deleteLater, QtCore.Qt.DirectConnection);
-        QtCore.QObject.connect(self.run_object, QtCore.SIGNAL("finished"), self.run_object.stopWork, QtCore.Qt.DirectConnection);
-        QtCore.QObject.connect(self.run_object, QtCore.SIGNAL("finished"), self.run_object.deleteLater, QtCore.Qt.DirectConnection);
-        QtCore.QObject.connect(self.run_object, QtCore.SIGNAL("finished"), self.run_thread.quit, QtCore.Qt.DirectConnection);
-        QtCore.QObject.connect(self.run_object, QtCore.SIGNAL("success"), self.after_run)
+                       'runtime_best_state': self.main_options['runtime_best'],
+                       'starts': self.main_options['starts']}
+        self._run_counter += 1
+        run_id = self._run_counter
+        run_object = AsyncRun(obj, state, run_options)
+        run_thread = QtCore.QThread()
+        self._runs[run_id] = (run_thread, run_object, self._method_modules[method]['title'], 
+                              self.task_cores(method))
+        QtCore.QObject.connect(run_thread, QtCore.SIGNAL("started()"), run_object.run, QtCore.Qt.DirectConnection);
+        QtCore.QObject.connect(run_thread, QtCore.SIGNAL("finished()"), run_object.deleteLater, QtCore.Qt.DirectConnection);
+        QtCore.QObject.connect(run_object, QtCore.SIGNAL("finished"), run_object.stopWork, QtCore.Qt.DirectConnection);
+        QtCore.QObject.connect(run_object, QtCore.SIGNAL("finished"), run_object.deleteLater, QtCore.Qt.DirectConnection);
+        QtCore.QObject.connect(run_object, QtCore.SIGNAL("finished"), run_thread.quit, QtCore.Qt.DirectConnection);
+        QtCore.QObject.connect(run_object, QtCore.SIGNAL("success"), partial(self.after_run, run_id))
 
-        QtCore.QObject.connect(self.run_object, QtCore.SIGNAL("display_value"), self.display_runtime_chart)
-        QtCore.QObject.connect(self.run_object, QtCore.SIGNAL("display_state"), self.display_runtime_state)
-        self.run_object.moveToThread(self.run_thread)
-        self.run_thread.start()
+        QtCore.QObject.connect(run_object, QtCore.SIGNAL("display_value"), partial(self.display_task_value, run_id))
+        QtCore.QObject.connect(run_object, QtCore.SIGNAL("display_state"), partial(self.display_task_state, run_id))
+        run_object.moveToThread(run_thread)
+        run_thread.start()
+        
+    def display_task_value(self, run_id, value, best_value=float('inf')):
+        """Displays runtime chart of the oldest running task only"""
+        if self._runs and run_id==min(self._runs):
+            self.display_runtime_chart(value, best_value)
+            
+    def display_task_state(self, run_id, state, value):
+        """Displays runtime state of the oldest running task only"""
+        if self._runs and run_id==min(self._runs):
+            self.display_runtime_state(state, value)
         
     def methods_tree_item_clicked(self):
         """Slot for clicking on method signal"""
-        if not self.run_thread:
+        if not self._runs:
             self.run_once()
             
     def get_checked_methods(self, only_checked=True):
@@ -853,7 +960,7 @@ class MainWindow(QtGui.QMainWindow):
         
     def get_problem_args(self):
         if self._current_problem=="tsp":
-            return [self.tsp_board.distance_matrix()]
+            return [self.tsp_board.shared_distance_matrix()]
         return None
         
     """
@@ -1067,8 +1174,10 @@ class MainWindow(QtGui.QMainWindow):
         self._chart_prev_best_value = float('inf')
                 
 if __name__ == "__main__":
-    sys.path.append(join(sys.path[0], 'methods'))
     app = QtGui.QApplication(sys.argv)
     myapp = MainWindow()
     myapp.show()
+    if os.environ.get('TSP_EXIT_ON_SHOW'):
+        # the time to the first window is measured by benchmark.py
+        QtCore.QTimer.singleShot(0, app.quit)
     sys.exit(app.exec_())
@@ -17,7 +17,7 @@ except AttributeError:
 class Ui_main_options(object):
     def setupUi(self, main_options):
         main_options.setObjectName(_fromUtf8("main_options"))
-        main_options.resize(428, 217)
+        main_options.resize(428, 247)
         self.gridLayout = QtGui.QGridLayout(main_options)
         self.gridLayout.setObjectName(_fromUtf8("gridLayout"))
         self.tabWidget = QtGui.QTabWidget(main_options)
@@ -25,7 +25,7 @@ class Ui_main_options(object):
         self.runtime_tab = QtGui.QWidget()
         self.runtime_tab.setObjectName(_fromUtf8("runtime_tab"))
         self.layoutWidget = QtGui.QWidget(self.runtime_tab)
-        self.layoutWidget.setGeometry(QtCore.QRect(9, 14, 391, 121))
+        self.layoutWidget.setGeometry(QtCore.QRect(9, 14, 391, 151))
         self.layoutWidget.setObjectName(_fromUtf8("layoutWidget"))
         self.verticalLayout = QtGui.QVBoxLayout(self.layoutWidget)
         self.verticalLayout.setMargin(0)
@@ -53,6 +53,19 @@ class Ui_main_options(object):
         self.runtime_solution = QtGui.QCheckBox(self.layoutWidget)
         self.runtime_solution.setObjectName(_fromUtf8("runtime_solution"))
         self.verticalLayout.addWidget(self.runtime_solution)
+        self.horizontalLayout_2 = QtGui.QHBoxLayout()
+        self.horizontalLayout_2.setSizeConstraint(QtGui.QLayout.SetFixedSize)
+        self.horizontalLayout_2.setObjectName(_fromUtf8("horizontalLayout_2"))
+        self.starts_label = QtGui.QLabel(self.layoutWidget)
+        self.starts_label.setObjectName(_fromUtf8("starts_label"))
+        self.horizontalLayout_2.addWidget(self.starts_label)
+        self.starts = QtGui.QSpinBox(self.layoutWidget)
+        self.starts.setMaximumSize(QtCore.QSize(100, 16777215))
+        self.starts.setMinimum(1)
+        self.starts.setProperty("value", 1)
+        self.starts.setObjectName(_fromUtf8("starts"))
+        self.horizontalLayout_2.addWidget(self.starts)
+        self.verticalLayout.addLayout(self.horizontalLayout_2)
         self.tabWidget.addTab(self.runtime_tab, _fromUtf8(""))
         self.gridLayout.addWidget(self.tabWidget, 0, 0, 1, 1)
         self.buttonBox = QtGui.QDialogButtonBox(main_options)
@@ -77,5 +90,7 @@ class Ui_main_options(object):
         self.runtime_best.setText(QtGui.QApplication.translate("main_options", "Show best solutions in runtime", None, QtGui.QApplication.UnicodeUTF8))
         self.runtime_solution.setToolTip(QtGui.QApplication.translate("main_options", "<html><head/><body><p>You will see how solutions are chaning during problem solving. This option may slow down the whole work process</p></body></html>", None, QtGui.QApplication.UnicodeUTF8))
         self.runtime_solution.setText(QtGui.QApplication.translate("main_options", "Show all solutions in runtime", None, QtGui.QApplication.UnicodeUTF8))
+        self.starts_label.setText(QtGui.QApplication.translate("main_options", "Number of parallel starts:", None, QtGui.QApplication.UnicodeUTF8))
+        self.starts.setToolTip(QtGui.QApplication.translate("main_options", "<html><head/><body><p>A method is run in several processes at once with different random seeds; the best found solution is taken</p></body></html>", None, QtGui.QApplication.UnicodeUTF8))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.runtime_tab), QtGui.QApplication.translate("main_options", "Runtime", None, QtGui.QApplication.UnicodeUTF8))
 
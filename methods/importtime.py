@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""Contains import time profiler of the modules.
+
+Python 2 has no "-X importtime" option, so the profiler puts a finder to
+sys.meta_path that times loading of every module. The time of a module
+includes the time of the modules that it imports (cumulative time); self
+time excludes them. A module should be profiled in a fresh interpreter,
+otherwise the modules that are already imported are not counted:
+
+    python -m methods.importtime main
+    python -m methods.importtime --json solve
+
+The report is printed in the same format as "python3 -X importtime" does:
+
+    import time: self [us] | cumulative | imported package
+    import time:       412 |        412 |     numpy.core.info
+    ...
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import imp
+import sys
+from importlib import import_module
+from pkgutil import ImpLoader
+from time import time
+
+class ImportProfiler(object):
+    """Finder of sys.meta_path that times loading of the modules
+
+    Modules are found with imp.find_module; modules that it can't find
+    (e.g. in zip files) are left to the standard import machinery and
+    are not timed.
+
+    Attributes:
+        records: list of (module name, self time, cumulative time, depth)
+            tuples of the loaded modules in order of their load end; the
+            times are in microseconds
+        _stack: times of the nested loads of the modules being loaded
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+
+    def find_module(self, fullname, path=None):
+        """Returns timing loader of the module or None"""
+        try:
+            loader_args = imp.find_module(fullname.rpartition('.')[2], path)
+        except ImportError:
+            return None
+        return _TimingLoader(self, ImpLoader(fullname, *loader_args))
+
+    def load_module(self, loader, fullname):
+        """Loads the module with the loader and records its load time"""
+        self._stack.append(0)
+        start_time = time()
+        try:
+            return loader.load_module(fullname)
+        finally:
+            cumulative = time() - start_time
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            self.records.append((fullname, int(1e6*(cumulative - nested)),
+                                 int(1e6*cumulative), len(self._stack)))
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.meta_path.remove(self)
+
+class _TimingLoader(object):
+    """Loader that passes loading of a module to the profiler"""
+
+    def __init__(self, profiler, loader):
+        self.profiler = profiler
+        self.loader = loader
+
+    def load_module(self, fullname):
+        return self.profiler.load_module(self.loader, fullname)
+
+def profile(module_name):
+    """Imports the module and returns its import profile
+
+    Returns:
+        Dictionary with the module name, the total import time (in
+        microseconds), the records of the loaded modules (see
+        ImportProfiler.records) and the import error message or None.
+    """
+    error = None
+    with ImportProfiler() as profiler:
+        start_time = time()
+        try:
+            import_module(module_name)
+        except Exception as e:
+            error = "%s: %s" % (e.__class__.__name__, e)
+        total = int(1e6*(time() - start_time))
+    return {'module': module_name, 'total_us': total,
+            'records': profiler.records, 'error': error}
+
+def format_records(records):
+    """Returns the records as lines of "python3 -X importtime" report"""
+    lines = ["import time: self [us] | cumulative | imported package"]
+    for name, self_time, cumulative, depth in records:
+        lines.append("import time: %9d | %10d | %s%s" % (
+            self_time, cumulative, "  "*depth, name))
+    return lines
+
+def main(args=None):
+    args = sys.argv[1:] if args is None else args
+    as_json = '--json' in args
+    names = [arg for arg in args if arg!='--json']
+    if len(names)!=1:
+        raise SystemExit("usage: python -m methods.importtime [--json] module")
+    report = profile(names[0])
+    if as_json:
+        import json
+        json.dump(report, sys.stdout, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        sys.stderr.write('\n'.join(format_records(report['records'])) + '\n')
+        if report['error']:
+            sys.stderr.write(report['error'] + '\n')
+
+if __name__ == '__main__':
+    main()
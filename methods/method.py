@@ -26,6 +26,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from statrecord import StatRecord
 from neighborhood import BasicNeighborhood
+from time import time
+import numpy.random
 
 class Method(object):
     """Base class for search methods
@@ -36,9 +38,34 @@ class Method(object):
         _type: method type (e.g. informed, local, etc.)
         _run_time_limit: amount of seconds that method can work
         _neighborhood: neighborhood object (used in get_neighbors function)
+        _uses_neighborhood: False if the method ignores the neighborhoods
+        _uses_processes: True if the method runs its own processes, so its 
+            problem arguments should be shared between the processes
         _disabled: if True then method will not be active in GUI
         _connection: Pipe connection to send information packages to the
             main application
+        _options: names of the method options; option "name" is stored in 
+            the "_name" attribute and can be set when the object is created
+        _run_options: names of the options that every method has
+        _seed: random seed of the runs (option "seed"); if None then each 
+            run draws its seed from the global numpy random generator
+        _random: numpy RandomState object of the current run; all the random 
+            choices of the method and its neighborhoods are made with it
+        _send_interval: minimal time (in seconds) between two progress 
+            messages to the main application
+        _send_iterations: if it isn't zero then progress messages are also 
+            sent every _send_iterations iterations
+        _pending_messages: latest cost and best state messages that have 
+            not been sent yet; the best state is kept as a copy and is 
+            packed only when the message is sent
+        _last_send: time and iteration of the last sent progress messages
+        _last_state_send: time and iteration of the last sent state
+        _iteration: number of send_current_cost calls (one per iteration)
+    
+    Progress messages are throttled: only the latest cost and best state are 
+    sent when the time comes, and the intermediate states are dropped. States 
+    are sent as packed strings (see State.pack). Please call flush_messages 
+    function to send the pending messages at the end of a run.
     """
     
     _name = "Basic method"
@@ -46,10 +73,23 @@ class Method(object):
     _type = "Undefined"
     _run_time_limit = 60
     _neighborhood = None
+    _uses_neighborhood = True
+    _uses_processes = False
     _disabled = False
     _connection = None
+    _options = ()
+    _run_options = ('seed',)
+    _seed = None
+    _random = numpy.random
+    _send_interval = 0.05
+    _send_iterations = 0
+    _pending_messages = None
+    _last_send = (0, 0)
+    _last_state_send = (0, 0)
+    _iteration = 0
     
-    def __init__(self, neighborhood=None, time_limit=None, args=None):
+    def __init__(self, neighborhood=None, time_limit=None, args=None, 
+                 options=None):
         """Inits the method object
         
         Args:
@@ -57,6 +97,7 @@ class Method(object):
             time_limit: time limit in seconds
             neighborhood: neighborhood objects list
             args: some additional argument that object can use
+            options: dictionary of the method options values
         """
         if not neighborhood:
             self._neighborhood = [BasicNeighborhood()]
@@ -66,6 +107,12 @@ class Method(object):
             self._neighborhood = [neighborhood]
         if time_limit:
             self._run_time_limit = time_limit
+        if options:
+            for name, value in options.items():
+                if name not in self._options + self._run_options:
+                    raise ValueError("Unknown option of %s method: %s" % 
+                                     (self._name, name))
+                setattr(self, '_' + name, value)
         
     def name(self):
         """Returns method's name"""
@@ -79,6 +126,34 @@ class Method(object):
         """Returns method's type"""
         return self._type
         
+    def options(self):
+        """Returns dictionary of the method options values"""
+        return dict((name, getattr(self, '_' + name)) 
+                    for name in self._run_options + self._options)
+        
+    def init_random(self, seed=None):
+        """Creates the random generator of a run
+        
+        The generator is shared with the neighborhoods of the method, so a 
+        run with the same seed and the same initial state is repeated exactly.
+        
+        Args:
+            seed: random seed; if None then the seed option is used, and if it 
+                isn't set either then the seed is drawn from the global numpy 
+                random generator
+            
+        Returns:
+            The seed of the generator.
+        """
+        if seed is None:
+            seed = self._seed
+        if seed is None:
+            seed = numpy.random.randint(1<<31)
+        self._random = numpy.random.RandomState(seed)
+        for neighborhood in self._neighborhood:
+            neighborhood.set_random(self._random)
+        return seed
+        
     def is_disabled(self):
         """Returns if the method is disabled"""
         return self._disabled
@@ -87,7 +162,8 @@ class Method(object):
         """Runs the method.
         
         Main function of the Method class. Runs the method.
-        At this class it only stores static statistical information to a 
+        At this class it only creates the random generator of the run (see 
+        init_random function) and stores static statistical information to a 
         statistic record.
         
         Args:
@@ -101,6 +177,7 @@ class Method(object):
             for GUI application.
         """
         stat.clear()
+        stat.seed = self.init_random()
         stat.problem = "Unknown"
         stat.method = self._short_name
         if self._neighborhood:
@@ -122,13 +199,137 @@ class Method(object):
             neighbors += neighbohood.get_neighbors(state)
         return neighbors
         
+    def iter_moves(self, state):
+        """Yields moves to neighbors of the state one by one.
+        
+        Get moves accordingly to self._neighborhood objects. If a 
+        neighborhood has no moves then its neighbor states are yielded as 
+        ('state', neighbor) moves.
+        
+        Args:
+            state: 
+        
+        Returns:
+            Iterator over moves that lead to neighbors of the state.
+        """
+        for neighbohood in self._neighborhood:
+            for move in self.iter_neighborhood_moves(neighbohood, state):
+                yield move
+        
+    def iter_neighborhood_moves(self, neighborhood, state):
+        """Yields moves of one neighborhood to neighbors of the state.
+        
+        Args:
+            neighborhood: neighborhood object
+            state: 
+        
+        Returns:
+            Iterator over moves that lead to neighbors of the state. If the 
+            neighborhood has no moves then its neighbor states are yielded as 
+            ('state', neighbor) moves.
+        """
+        has_moves = False
+        for move in neighborhood.iter_moves(state):
+            has_moves = True
+            yield move
+        if not has_moves:
+            for neighbor in neighborhood.get_neighbors(state):
+                yield ('state', neighbor)
+        
+    def random_move(self, state):
+        """Returns a random move to a neighbor of the state.
+        
+        The move is taken from a randomly chosen neighborhood of 
+        self._neighborhood objects, so the neighborhood moves are not built. 
+        If the neighborhood has no moves then one of its neighbor states is 
+        returned as ('state', neighbor) move.
+        
+        Args:
+            state: 
+        
+        Returns:
+            Move that leads to a random neighbor of the state. None if the 
+            chosen neighborhood has no neighbors of the state.
+        """
+        if not self._neighborhood:
+            return None
+        neighborhood = self._neighborhood[self._random.randint(len(self._neighborhood))]
+        move = neighborhood.random_move(state)
+        if move is None:
+            neighbors = neighborhood.get_neighbors(state)
+            if neighbors:
+                move = ('state', neighbors[self._random.randint(len(neighbors))])
+        return move
+        
+    def get_moves(self, state):
+        """Returns moves to neighbors of the state.
+        
+        Args:
+            state: 
+        
+        Returns:
+            List of moves that lead to neighbors of the state.
+        """
+        return list(self.iter_moves(state))
+        
     def calc_solution_cost(self, state):
         """Calculates a state cost value. Returns zero."""
         return 0
         
+    def move_delta(self, state, move):
+        """Calculates a change of the state cost value after a move.
+        
+        The cost of the moved state is fully recalculated here. Methods for 
+        a specific problem should reimplement it in a cheaper way.
+        
+        Args:
+            state: 
+            move: move descriptor
+            
+        Returns:
+            Difference between costs of the moved state and the state.
+        """
+        new_state = state.copy()
+        new_state.apply_move(move)
+        return self.calc_solution_cost(new_state) - self.calc_solution_cost(state)
+        
     def set_connection(self, conn):
         """Stores pipe connection object"""
         self._connection = conn
+        self._pending_messages = {}
+        self._last_send = self._last_state_send = (0, 0)
+        self._iteration = 0
+        
+    def _is_send_due(self, last_send):
+        """Checks if the time has come to send next progress messages
+        
+        Args:
+            last_send: tuple (time, iteration) of the last send
+        """
+        last_time, last_iteration = last_send
+        if (self._send_iterations and 
+                self._iteration - last_iteration>=self._send_iterations):
+            return True
+        return time() - last_time>=self._send_interval
+        
+    def _send(self, msg):
+        """Sends a message to the main application"""
+        try:
+            self._connection.send(msg)
+        except:
+            return
+        
+    def flush_messages(self):
+        """Sends all pending progress messages to the main application"""
+        if not self._connection:
+            return
+        for kind in ("best_state", "cost"):
+            msg = self._pending_messages.pop(kind, None)
+            if msg and kind=="best_state":
+                msg = (kind, msg[1].pack()) + msg[2:]
+            if msg:
+                self._send(msg)
+        self._last_send = (time(), self._iteration)
         
     def send_current_cost(self, value, best_value=None):
         """Send cost value to the main application
@@ -138,10 +339,10 @@ class Method(object):
             best_value: best cost value
         """
         if self._connection:
-            try:
-                self._connection.send(("cost",value,best_value))
-            except:
-                return
+            self._iteration += 1
+            self._pending_messages["cost"] = ("cost", value, best_value)
+            if self._is_send_due(self._last_send):
+                self.flush_messages()
            
     def send_best_state(self, state, value, stat=None):
         """Send best state to the main application
@@ -152,10 +353,10 @@ class Method(object):
             stat: statistics record for this state
         """
         if self._connection:
-            try:
-                self._connection.send(("best_state", state, value, stat))
-            except:
-                return
+            self._pending_messages["best_state"] = ("best_state", state.copy(), 
+                                                    value, stat)
+            if self._is_send_due(self._last_send):
+                self.flush_messages()
            
     def send_state(self, state, value):
         """Send a state to the main application
@@ -164,8 +365,6 @@ class Method(object):
             state: state
             value: state's cost value
         """
-        if self._connection:
-            try:
-                self._connection.send(("state", state, value))
-            except:
-                return
\ No newline at end of file
+        if self._connection and self._is_send_due(self._last_state_send):
+            self._last_state_send = (time(), self._iteration)
+            self._send(("state", state.pack(), value))
@@ -6,6 +6,19 @@ neighborhoods.
 
 All neighborhoods should be iherited from this class.
 
+A neighborhood describes neighbors of a state with moves. A move is a tuple 
+that starts with a move kind name followed by its parameters, e.g. 
+('2opt', i, j). Moves are yielded lazily by iter_moves function. A state 
+applies a move with its apply_move function, so methods could evaluate moves 
+without building all neighbor states.
+
+Neighborhoods that only reimplement get_neighbors function are still 
+supported: methods wrap their neighbors to ('state', neighbor) moves.
+
+Neighborhoods which moves are all of one kind could also return them as 
+a batch of arrays in get_move_batch function. Then methods could evaluate 
+the whole neighborhood at once with numpy.
+
 @author: Oleksii Molchanovskyi
 @organization: Kyiv Polytechnic Institute
 @country: Ukraine
@@ -24,6 +37,8 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import numpy.random
+
 class BasicNeighborhood(object):
     """Base class for neighborhood.
     
@@ -36,15 +51,81 @@ class BasicNeighborhood(object):
             if there are several default neighborhoods the first one will be
             selected
         _disabled: is neighborhood dropped from the list of neighborhoods
+        _random: numpy RandomState object for the random choices; the global 
+            numpy random generator is used until the method sets its own one
     """
     
     _name = "Empty neighborhood"
     _short_name = "Empty"
     _default = False
     _disabled = False
+    _random = numpy.random
     
+    def set_random(self, generator):
+        """Sets numpy RandomState object for the random choices"""
+        self._random = generator
+        
+    def iter_moves(self, state):
+        """Yields moves to neighbor states one by one. Yields nothing.
+        
+        Args:
+            state:
+            
+        Returns:
+            Iterator over the moves that lead to neighbors of the specified 
+            state.
+        """
+        return iter([])
+        
+    def get_moves(self, state):
+        """Returns a list of moves to neighbor states.
+        
+        Args:
+            state:
+            
+        Returns:
+            List of the moves that lead to neighbors of the specified state.
+        """
+        return list(self.iter_moves(state))
+        
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        The move is chosen from iter_moves function uniformly without 
+        building a list of the moves. Neighborhoods that can pick a move 
+        directly should reimplement the function.
+        
+        Args:
+            state:
+            
+        Returns:
+            Random move that leads to a neighbor of the specified state. 
+            None if there are no moves.
+        """
+        move = None
+        for count, candidate in enumerate(self.iter_moves(state), 1):
+            if self._random.randint(count)==0:
+                move = candidate
+        return move
+        
+    def get_move_batch(self, state):
+        """Returns moves to neighbor states as a batch. Returns None.
+        
+        Args:
+            state:
+            
+        Returns:
+            Tuple (kind, first, second) of a move kind and two arrays of the 
+            move parameters, so the k-th move is (kind, first[k], second[k]).
+            None if the neighborhood does not support batches.
+        """
+        return None
+        
     def get_neighbors(self, state):
-        """Returns a list of neighbor states for the state. Returns empty list.
+        """Returns a list of neighbor states for the state.
+        
+        Neighbors are built by applying the moves from iter_moves function to 
+        copies of the state.
         
         Args:
             state:
@@ -52,7 +133,12 @@ class BasicNeighborhood(object):
         Returns:
             List of the states that are neighbors to the specified state.
         """
-        return []
+        neighbors = []
+        for move in self.iter_moves(state):
+            new_state = state.copy()
+            new_state.apply_move(move)
+            neighbors.append(new_state)
+        return neighbors
         
     def name(self):
         return self._name
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Contains helper functions for pipe connections between processes.
+
+Function wait blocks until some of the pipe connections have data to 
+receive. It's used by the main application and by the parallel methods to 
+receive messages without sleep polling.
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import errno
+import select
+import sys
+from time import time, sleep
+
+def wait(connections, timeout=None):
+    """Waits until some of the connections have data to receive
+    
+    A single connection is waited with its poll function, several connections 
+    are waited with select. Pipes can't be selected on Windows, so there the 
+    connections are polled in turn with a millisecond pause.
+    
+    Args:
+        connections: list of Pipe connections
+        timeout: maximum time to wait (in seconds); None means no limit
+        
+    Returns:
+        List of the connections that have data to receive. It's empty if 
+        the timeout has been reached.
+    """
+    if not connections:
+        if timeout:
+            sleep(timeout)
+        return []
+    if len(connections)==1:
+        return connections if connections[0].poll(timeout) else []
+    if sys.platform!='win32':
+        try:
+            return select.select(connections, [], [], timeout)[0]
+        except select.error as e:
+            if e.args[0]==errno.EINTR:
+                return []
+            raise
+    end_time = None if timeout is None else time() + timeout
+    while True:
+        ready = [conn for conn in connections if conn.poll()]
+        if ready or (end_time is not None and time()>=end_time):
+            return ready
+        sleep(0.001)
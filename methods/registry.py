@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+"""Contains the registry of the methods and neighborhoods of the problems.
+
+The methods and neighborhoods of a problem are the classes in the modules of
+its package (e.g. methods/tsp) that are inherited from BasicMethod and
+BasicNeighborhood classes. Finding them requires importing all the modules,
+so the registry does it only once: the found classes are described in a
+manifest that is kept in memory and in methods/<problem>/.registry.json file.
+The manifest is keyed by the modification times of the problem modules and
+of the base modules in the methods package, so it's rebuilt only when one of
+the files is added, removed or modified.
+
+The registry doesn't import the modules of the classes until they are
+loaded with ClassInfo.load function:
+
+    from methods.registry import get_registry
+    registry = get_registry('tsp')
+    for info in registry.methods():
+        print info.name, info.title
+    method_class = registry.get('Tabu').load()
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import sys
+from importlib import import_module
+
+_methods_path = os.path.dirname(os.path.abspath(__file__))
+
+METHOD = 'method'
+NEIGHBORHOOD = 'neighborhood'
+
+def is_subclass(class_obj, parent_class_name):
+    """Checks if the class is inherited from a class with the name"""
+    import inspect
+    if class_obj.__name__==parent_class_name:
+        return False
+    for cl in inspect.getmro(class_obj):
+        if cl.__name__==parent_class_name:
+            return True
+    return False
+
+class ClassInfo(object):
+    """Description of a method or neighborhood class
+
+    Attributes:
+        name: class name
+        kind: METHOD or NEIGHBORHOOD
+        module: full name of the module of the class
+        file: file name of the module
+        title: title of the method or neighborhood (its _name attribute)
+        short_title: shorter title (its _short_name attribute)
+        type: method type; None for neighborhoods
+        disabled: if True then the class is not active
+        default: if the neighborhood is a default one; False for methods
+        options: names of the method options
+        uses_neighborhood: False if the method ignores the neighborhoods
+        uses_processes: True if the method runs its own processes
+    """
+
+    _fields = ('name', 'kind', 'module', 'file', 'title', 'short_title',
+               'type', 'disabled', 'default', 'options', 'uses_neighborhood',
+               'uses_processes')
+
+    def __init__(self, **fields):
+        for name in self._fields:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_class(cls, class_obj, kind, file_name):
+        """Describes the class of the kind from the file"""
+        is_method = kind==METHOD
+        return cls(name=class_obj.__name__, kind=kind,
+                   module=class_obj.__module__, file=file_name,
+                   title=class_obj._name, short_title=class_obj._short_name,
+                   type=class_obj._type if is_method else None,
+                   disabled=bool(class_obj._disabled),
+                   default=not is_method and bool(class_obj._default),
+                   options=list(class_obj._options) if is_method else [],
+                   uses_neighborhood=is_method and class_obj._uses_neighborhood,
+                   uses_processes=is_method and class_obj._uses_processes)
+
+    def to_dict(self):
+        """Returns the description as a dictionary"""
+        return dict((name, getattr(self, name)) for name in self._fields)
+
+    def load(self):
+        """Imports the module of the class and returns the class"""
+        module = sys.modules.get(self.module) or import_module(self.module)
+        return getattr(module, self.name)
+
+class Registry(object):
+    """Registry of the methods and neighborhoods of a problem
+
+    Attributes:
+        problem: problem package name in the methods package
+        _path: path of the problem package
+        _manifest_file: file name of the saved manifest
+        _key: modification times of the modules by their file names that
+            the manifest was built for
+        _classes: list of ClassInfo objects sorted by the class names
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self._path = os.path.join(_methods_path, problem)
+        self._manifest_file = os.path.join(self._path, '.registry.json')
+        self._key = None
+        self._classes = []
+
+    def _module_files(self):
+        """Returns the module files of the problem package"""
+        return sorted(f for f in os.listdir(self._path) if f.endswith('.py'))
+
+    def _current_key(self):
+        """Returns modification times of the modules the manifest depends on
+
+        The base modules of the methods package are included, because the
+        classes inherit their attributes from them.
+        """
+        key = {}
+        for path, prefix in ((_methods_path, ''), (self._path, self.problem + '/')):
+            for file_name in os.listdir(path):
+                if file_name.endswith('.py'):
+                    key[prefix + file_name] = os.path.getmtime(os.path.join(path, file_name))
+        return key
+
+    def _scan(self):
+        """Imports all the modules of the problem and describes their classes"""
+        # inspect is slow to import and is needed only to rebuild the manifest
+        import inspect
+        classes = []
+        for file_name in self._module_files():
+            module_name = 'methods.%s.%s' % (self.problem, file_name[:-len('.py')])
+            module = import_module(module_name)
+            for name, obj in inspect.getmembers(module, inspect.isclass):
+                if obj.__module__!=module_name:
+                    continue
+                if is_subclass(obj, "BasicMethod"):
+                    classes.append(ClassInfo.from_class(obj, METHOD, file_name))
+                elif is_subclass(obj, "BasicNeighborhood"):
+                    classes.append(ClassInfo.from_class(obj, NEIGHBORHOOD, file_name))
+        return sorted(classes, key=lambda info: info.name)
+
+    def _load_manifest(self, key):
+        """Loads the saved manifest if it was built for the key"""
+        try:
+            with open(self._manifest_file) as f:
+                manifest = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if manifest.get('key')!=key:
+            return None
+        return [ClassInfo(**dict((str(name), value) for name, value in fields.items()))
+                for fields in manifest['classes']]
+
+    def _save_manifest(self):
+        """Saves the manifest; a read-only package is left without it"""
+        manifest = {'key': self._key,
+                    'classes': [info.to_dict() for info in self._classes]}
+        try:
+            with open(self._manifest_file, 'w') as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+        except (IOError, OSError):
+            pass
+
+    def refresh(self):
+        """Rebuilds the manifest if the modules were changed
+
+        Returns:
+            True if the manifest was changed.
+        """
+        key = self._current_key()
+        if key==self._key:
+            return False
+        classes = self._load_manifest(key)
+        self._key = key
+        if classes is None:
+            self._classes = self._scan()
+            self._save_manifest()
+        else:
+            self._classes = classes
+        return True
+
+    def methods(self, enabled_only=False):
+        """Returns list of ClassInfo objects of the methods"""
+        return [info for info in self._classes if info.kind==METHOD and
+                not (enabled_only and info.disabled)]
+
+    def neighborhoods(self, enabled_only=True):
+        """Returns list of ClassInfo objects of the neighborhoods"""
+        return [info for info in self._classes if info.kind==NEIGHBORHOOD and
+                not (enabled_only and info.disabled)]
+
+    def get(self, name):
+        """Returns ClassInfo object of the class with the name or None"""
+        for info in self._classes:
+            if info.name==name:
+                return info
+        return None
+
+_registries = {}
+
+def get_registry(problem='tsp', refresh=True):
+    """Returns the registry of the problem
+
+    Args:
+        problem: problem package name in the methods package
+        refresh: if True then the registry is checked for the changed modules
+    """
+    if not _registries.has_key(problem):
+        _registries[problem] = Registry(problem)
+        refresh = True
+    if refresh:
+        _registries[problem].refresh()
+    return _registries[problem]
+
+def find_classes(problem='tsp'):
+    """Finds methods and neighborhoods of the problem
+
+    Args:
+        problem: problem package name in the methods package
+
+    Returns:
+        Tuple (methods, neighborhoods) of dictionaries of the enabled
+        classes by their names.
+    """
+    registry = get_registry(problem)
+    return (dict((info.name, info.load()) for info in registry.methods(enabled_only=True)),
+            dict((info.name, info.load()) for info in registry.neighborhoods()))
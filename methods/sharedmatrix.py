@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Contains class for matrices that are shared between processes.
+
+Methods are run in separate processes. A distance matrix that is passed to 
+a method object would be pickled and copied to every process. Class 
+SharedMatrix places a matrix into a shared memory segment once, so child 
+processes attach to the same memory without copying.
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from multiprocessing.sharedctypes import RawArray
+from numpy import frombuffer, load, memmap
+import ctypes
+
+class SharedMatrix(object):
+    """Picklable handle of a matrix that is shared between processes.
+    
+    A matrix is copied to a shared memory segment, while a memory-mapped 
+    matrix is shared through its file. Only the handle is pickled, and 
+    the matrix is attached to again in the child process. Handles with a 
+    shared memory segment can be passed to child processes only when the 
+    processes are created.
+    
+    Attributes:
+        _buffer: shared memory segment (RawArray) with the matrix data
+        _filename: file name of a memory-mapped matrix
+        _shape: shape of the matrix
+        _dtype: type of the matrix elements
+        _array: numpy array that is attached to the shared data; it is not 
+            pickled
+    """
+    _buffer = None
+    _filename = None
+    _shape = None
+    _dtype = None
+    _array = None
+    
+    def __init__(self, matrix):
+        """Places the matrix to shared memory
+        
+        Args:
+            matrix: numpy array or numpy memmap
+        """
+        self._shape = matrix.shape
+        self._dtype = matrix.dtype
+        if isinstance(matrix, memmap) and matrix.filename:
+            self._filename = matrix.filename
+            self._array = matrix
+        else:
+            self._buffer = RawArray(ctypes.c_char, matrix.nbytes)
+            self._array = self._attach()
+            self._array[...] = matrix
+        
+    def _attach(self):
+        """Returns numpy array that uses the shared data"""
+        if self._filename:
+            return load(self._filename, mmap_mode='r')
+        return frombuffer(self._buffer, dtype=self._dtype).reshape(self._shape)
+        
+    def array(self):
+        """Returns the shared matrix as numpy array"""
+        if self._array is None:
+            self._array = self._attach()
+        return self._array
+        
+    def __getstate__(self):
+        """Pickles the handle without the matrix data"""
+        state = self.__dict__.copy()
+        state['_array'] = None
+        return state
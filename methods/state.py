@@ -27,9 +27,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 class State(object):
     """Describes a state of a specific problem.
     
+    The class defines empty __slots__, so subclasses could store their data 
+    in slots without instance dictionaries.
+    
     Attributes:
         _state: some container (pure abstract)
     """
+    __slots__ = ()
     _state = None
     
     def copy(self):
@@ -50,6 +54,37 @@ class State(object):
         """
         pass
         
+    def apply_move(self, move):
+        """Applies a move to this state in place. Purely abstract.
+        
+        Args:
+            move: move descriptor produced by a neighborhood
+        """
+        pass
+        
+    def pack(self):
+        """Packs the state to a compact string of bytes. Purely abstract.
+        
+        The packed states are sent between processes instead of the pickled 
+        state objects.
+        
+        Returns:
+            String of bytes that is unpacked by unpack function.
+        """
+        pass
+        
+    @classmethod
+    def unpack(cls, data):
+        """Creates a state from packed data. Purely abstract.
+        
+        Args:
+            data: string of bytes that is returned by pack function
+            
+        Returns:
+            New state object.
+        """
+        pass
+        
     def random_generate(self):
         """Generate a random state. Purely abstract.
         
@@ -32,11 +32,14 @@ class StatRecord:
     Attributes:
         overall_nodes_generated: summarized amount of nodes (states) that were 
             generated during some method run
+        overall_iterations: amount of iterations of the method's main loop
         overall_run_time: overall run time of a method
         problem: problem name
         method: method name (title)
         neighborhood: neighborhoods' names
         solution_cost: cost value of a solution of the problem
+        seed: random seed of the run; the run is repeated with the same seed 
+            and the same initial state
     """
     overall_run_time = 0
     problem = "Unknown"
@@ -44,11 +47,23 @@ class StatRecord:
     neighborhood = "Unknown"
     solution_cost = float('inf')
     overall_nodes_generated = 0
+    overall_iterations = 0
+    seed = None
     
+    _fields = ('problem', 'method', 'neighborhood', 'solution_cost', 
+               'overall_run_time', 'overall_nodes_generated', 
+               'overall_iterations', 'seed')
+    
+    def to_dict(self):
+        """Returns the statistics as a dictionary"""
+        return dict((name, getattr(self, name)) for name in self._fields)
+        
     def clear(self):
         self.overall_run_time = 0
         self.overall_nodes_generated = 0
+        self.overall_iterations = 0
         self.solution_cost = float('inf')
         self.problem = "Unknown"
         self.method = "Unknown"
-        self.neighborhood = "Unknown"
\ No newline at end of file
+        self.neighborhood = "Unknown"
+        self.seed = None
\ No newline at end of file
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""Contains level-gated tracing facility for the searching methods.
+
+Methods shouldn't print diagnostic messages in their loops: printing limits
+the method speed to the speed of a terminal. Instead a module gets a named
+Tracer object and traces its messages through it. All tracers are turned off
+by default, so a trace call costs only one check of the Tracer.enabled flag
+when it is guarded:
+
+    from methods.trace import get_tracer, DEBUG
+    _trace = get_tracer('sa')
+    ...
+    if _trace.enabled:
+        _trace.debug("accept", delta=delta, T=T)
+
+Tracers are turned on by set_level function or by TSP_TRACE environment
+variable with a comma separated list of "name=level" pairs, e.g.
+TSP_TRACE="sa=debug,tabu=info". A name "all" sets the level of all tracers.
+Each traced message is a line "name LEVEL message key=value ..." written to
+the output stream (stderr by default).
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import sys
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+_level_names = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'off': OFF}
+
+class Tracer(object):
+    """Named tracer of the diagnostic messages
+
+    Attributes:
+        name: tracer name (usually a short name of a module)
+        level: minimal level of the traced messages
+        enabled: True if any messages are traced; check it before a trace
+            call in a loop
+    """
+
+    _output = sys.stderr
+
+    def __init__(self, name, level=OFF):
+        self.name = name
+        self.set_level(level)
+
+    def set_level(self, level):
+        """Sets minimal level of the traced messages"""
+        self.level = level
+        self.enabled = level<OFF
+
+    def trace(self, level, message, **fields):
+        """Traces the message with its fields if the level is high enough
+
+        Args:
+            level: message level
+            message: message text
+            fields: named values that are traced with the message
+        """
+        if level<self.level:
+            return
+        names = dict((value, name.upper()) for name, value in _level_names.items())
+        line = [self.name, names.get(level, str(level)), message]
+        line += ['%s=%s' % (name, fields[name]) for name in sorted(fields)]
+        Tracer._output.write(' '.join(line) + '\n')
+
+    def debug(self, message, **fields):
+        """Traces a debug message"""
+        self.trace(DEBUG, message, **fields)
+
+    def info(self, message, **fields):
+        """Traces an information message"""
+        self.trace(INFO, message, **fields)
+
+    def warning(self, message, **fields):
+        """Traces a warning message"""
+        self.trace(WARNING, message, **fields)
+
+_tracers = {}
+_levels = {}
+
+def get_tracer(name):
+    """Returns the tracer with the name; creates it if it doesn't exist"""
+    if not _tracers.has_key(name):
+        _tracers[name] = Tracer(name, _levels.get(name, _levels.get('all', OFF)))
+    return _tracers[name]
+
+def set_level(level, name='all'):
+    """Sets level of the tracer with the name or of all the tracers
+
+    Args:
+        level: level value or its name ("debug", "info", "warning", "off")
+        name: tracer name or "all"
+
+    Raises:
+        ValueError: if the level name is unknown
+    """
+    if isinstance(level, basestring):
+        if not _level_names.has_key(level.lower()):
+            raise ValueError("Unknown trace level: %s" % level)
+        level = _level_names[level.lower()]
+    if name=='all':
+        _levels.clear()
+        for tracer in _tracers.values():
+            tracer.set_level(level)
+    elif _tracers.has_key(name):
+        _tracers[name].set_level(level)
+    _levels[name] = level
+
+def set_output(stream):
+    """Sets the output stream of all the tracers"""
+    Tracer._output = stream
+
+def configure(spec):
+    """Sets the tracers levels from a "name=level,..." string
+
+    Items with unknown levels are ignored with a warning to stderr, so a 
+    misspelled TSP_TRACE variable doesn't break the import of the module.
+    """
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, sep, level = item.strip().rpartition('=')
+        try:
+            set_level(level, name or 'all')
+        except ValueError as e:
+            sys.stderr.write("Trace setting %r is ignored: %s\n" % (item.strip(), e))
+
+configure(os.environ.get('TSP_TRACE', ''))
@@ -25,6 +25,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from methods.statrecord import StatRecord
 from methods.method import Method
+from methods.sharedmatrix import SharedMatrix
+from numpy import asarray, roll, where
 
 class BasicMethod(Method):
     """Base class for search methods for the N-queens problem.
@@ -33,11 +35,24 @@ class BasicMethod(Method):
         __init__
         run
         calc_solution_cost
+        move_delta
+        batch_move_delta
+    
+    The methods that accumulate the tour cost from the move deltas should 
+    call update_cost function, so the rounding errors don't accumulate, and 
+    should count a move as an improvement only if its delta is less than 
+    -_epsilon.
 
     Attributes:
         _distance_matrix: stores a distance matrix for TSP
             Distance matrix for N cities TSP problem is a NxN matrix each cell
             [i,j] of which stores distance from city @i to city @j
+        _shared_matrix: SharedMatrix handle if the distance matrix is placed 
+            to shared memory; then only the handle is pickled when the method 
+            object is passed to a run process
+        _epsilon: minimal cost decrease that is an improvement
+        _resync_interval: number of iterations between recalculations of 
+            the accumulated tour cost
         For other attributes please refer to Method class description.
     """
     
@@ -46,10 +61,32 @@ class BasicMethod(Method):
     _type = "Undefined"
     _run_time_limit = 60
     _distance_matrix = None
+    _shared_matrix = None
+    _epsilon = 1e-9
+    _resync_interval = 1000
     
-    def __init__(self, neighborhood=None, time_limit=None, args=None):
-        super(BasicMethod, self).__init__(neighborhood, time_limit, args)
-        self._distance_matrix = args[0]
+    def __init__(self, neighborhood=None, time_limit=None, args=None, 
+                 options=None):
+        super(BasicMethod, self).__init__(neighborhood, time_limit, args, 
+                                          options)
+        matrix = args[0]
+        if isinstance(matrix, SharedMatrix):
+            self._shared_matrix = matrix
+            matrix = matrix.array()
+        self._distance_matrix = matrix
+        
+    def __getstate__(self):
+        """Pickles the method without a shared distance matrix data"""
+        state = self.__dict__.copy()
+        if self._shared_matrix is not None:
+            del state['_distance_matrix']
+        return state
+        
+    def __setstate__(self, state):
+        """Restores the method and attaches to a shared distance matrix"""
+        self.__dict__.update(state)
+        if self._shared_matrix is not None:
+            self._distance_matrix = self._shared_matrix.array()
     
     def run(self, initial_state, stat=StatRecord()):
         """Runs the method.
@@ -80,9 +117,92 @@ class BasicMethod(Method):
                 d[0][3] + d[3][1] + d[1][2] + d[2][0], 
                 where d is a distance matrix self._distance_matrix
         """
-        cost = 0
-        prev_city = state._cities[state.cities_num()-1]
-        for next_city in state._cities:
-            cost += self._distance_matrix[prev_city][next_city]
-            prev_city = next_city
-        return cost
\ No newline at end of file
+        cities = asarray(state._cities)
+        return float(self._distance_matrix[roll(cities, 1), cities].sum())
+        
+    def update_cost(self, state, value, delta, iteration):
+        """Returns the cost of a tour after a move
+        
+        The cost is accumulated from the move deltas, and every 
+        _resync_interval iterations it's recalculated from the tour.
+        
+        Args:
+            state: moved state
+            value: cost of the state before the move
+            delta: change of the cost by the move
+            iteration: number of the iteration
+        """
+        if iteration % self._resync_interval:
+            return value + delta
+        return self.calc_solution_cost(state)
+        
+    def move_delta(self, state, move):
+        """Returns a change of the tour distance after a move.
+        
+        Only the few edges that are changed by the move are taken into 
+        account, so the change is calculated in constant time. Only 
+        ('state', state) moves are fully recalculated.
+        
+        Args:
+            state: input state
+            move: move descriptor, see TspState class description
+            
+        Returns:
+            Difference between distances of the moved tour and the tour.
+        """
+        if move[0]=='state':
+            return self.calc_solution_cost(move[1]) - self.calc_solution_cost(state)
+        removed, added = state.move_edges(move)
+        d = self._distance_matrix
+        delta = 0.0
+        for a, b in added:
+            delta += d[a, b]
+        for a, b in removed:
+            delta -= d[a, b]
+        return delta
+        
+    def batch_move_delta(self, state, kind, first, second):
+        """Returns changes of the tour distance after a batch of moves.
+        
+        All moves of the batch are evaluated at once with numpy fancy indexing 
+        of the distance matrix.
+        
+        Args:
+            state: input state
+            kind: kind of the moves ('insert', 'swap' or '2opt')
+            first: array of the first parameters of the moves
+            second: array of the second parameters of the moves
+            
+        Returns:
+            Array of differences between distances of the moved tours and 
+            the tour; the k-th item is a delta of (kind, first[k], second[k]).
+        """
+        cities = asarray(state._cities)
+        n = len(cities)
+        d = self._distance_matrix
+        i, j = asarray(first), asarray(second)
+        if kind=='2opt':
+            a, b = cities[i], cities[(i+1)%n]
+            c, e = cities[j], cities[(j+1)%n]
+            return d[a, c] + d[b, e] - d[a, b] - d[c, e]
+        elif kind=='swap':
+            def edge_delta(k):
+                l = (k+1)%n
+                old = d[cities[k], cities[l]]
+                k_city = where(k==i, cities[j], where(k==j, cities[i], cities[k]))
+                l_city = where(l==i, cities[j], where(l==j, cities[i], cities[l]))
+                return d[k_city, l_city] - old
+            k1, k3 = (i-1)%n, (j-1)%n
+            # adjacent positions share an edge, it is counted once
+            return (edge_delta(k1) + edge_delta(i) + (k3!=i)*edge_delta(k3) + 
+                    (j!=k1)*edge_delta(j))
+        elif kind=='insert':
+            city, prev_city, next_city = cities[i], cities[i-1], cities[(i+1)%n]
+            a, b = (j-1)%(n-1), j%(n-1)
+            a = cities[where(a<i, a, a+1)]
+            b = cities[where(b<i, b, b+1)]
+            delta = (d[prev_city, next_city] - d[prev_city, city] - d[city, next_city] + 
+                     d[a, city] + d[city, b] - d[a, b])
+            delta[(a==prev_city) & (b==next_city)] = 0
+            return delta
+        raise ValueError("Unknown move kind: %r" % (kind,))
\ No newline at end of file
@@ -28,7 +28,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from basicmethod import BasicMethod
 from methods.statrecord import StatRecord
 from time import time
-from numpy.random import randint, random
 
 class HillClimbing(BasicMethod):
     """Hill climbing local search method implementation for the TSP problem.
@@ -64,25 +63,43 @@ class HillClimbing(BasicMethod):
             if time()-start_time > self._run_time_limit:
                 return ever_found_best_state, "Run time limit has been reached"
                 
-            new_states = self.get_neighbors(state)
-            best_state, best_value = None, float('inf')
-            for new_state in new_states:
-                v = self.calc_solution_cost(new_state)
-                if v<best_value and v<value:
-                    best_state, best_value = new_state, v
+            moves_num = 0
+            best_move, best_delta = None, -self._epsilon
+            for neighborhood in self._neighborhood:
+                batch = neighborhood.get_move_batch(state)
+                if batch is not None:
+                    # the whole neighborhood is evaluated with numpy at once
+                    kind, first, second = batch
+                    moves_num += len(first)
+                    if not len(first):
+                        continue
+                    deltas = self.batch_move_delta(state, kind, first, second)
+                    k = deltas.argmin()
+                    if deltas[k]<best_delta:
+                        best_move = (kind, int(first[k]), int(second[k]))
+                        best_delta = deltas[k]
+                    continue
+                for move in self.iter_neighborhood_moves(neighborhood, state):
+                    moves_num += 1
+                    delta = self.move_delta(state, move)
+                    if delta<best_delta:
+                        best_move, best_delta = move, delta
                     
-            if not best_state:
+            if not best_move:
                 break
             
-            state, value = best_state, best_value
+            state.apply_move(best_move)
+            value = self.update_cost(state, value, best_delta, 
+                                     stat.overall_iterations + 1)
             self.send_state(state, value)
 #            print state, value
-            if value<stat.solution_cost:
+            if value<stat.solution_cost - self._epsilon:
                 ever_found_best_state.copy_from(state)
                 stat.solution_cost = value
                 self.send_best_state(ever_found_best_state, value, stat)
             
-            stat.overall_nodes_generated += len(new_states)
+            stat.overall_nodes_generated += moves_num
+            stat.overall_iterations += 1
             stat.overall_run_time = time() - start_time
             
         return ever_found_best_state, "Local optimum is reached"
@@ -181,8 +198,9 @@ class RandomHillClimbing(BasicMethod):
             #
             # TODO: Write your implementation of the 
             # Random hill climbing local search method with side moves
-            # Use randint or random functions for randomize stuff
-            # Refer to help(numpy.random.randint) and help(numpy.random.random)
+            # Use self._random.randint or self._random.random_sample 
+            # functions for randomize stuff, so a run could be repeated by 
+            # its seed. Refer to help(numpy.random.RandomState)
             #
             
             self.send_state(state, value)
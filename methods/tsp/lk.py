@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""Contains Lin-Kernighan style metaheuristic method for the TSP problem.
+
+Class LinKernighan is inherited from BasicMethod. It implements iterated 
+Lin-Kernighan search: a variable-depth local search that builds chains of 
+2-opt flips, and double bridge kicks that move the search out of its local 
+optima until the run time limit is reached.
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from basicmethod import BasicMethod
+from tour import ArrayTour, nearest_neighbor_tour, neighbor_lists
+from methods.statrecord import StatRecord
+from collections import deque
+from time import time
+
+class LinKernighan(BasicMethod):
+    """Iterated Lin-Kernighan metaheuristic method implementation for the TSP.
+    
+    A Lin-Kernighan step starts from city t1 and its tour neighbor t2 and 
+    removes edge (t1, t2). Then edge (t2, t3) to a near city t3 is added and 
+    edge (t3, t4) is removed, so the tour could be closed with edge (t4, t1). 
+    This is a 2-opt flip; the chain is continued from t4 while the partial 
+    gain stays positive, and the flips after the best closed tour are undone. 
+    Gains are calculated incrementally from the changed edges only.
+    
+    When no city could be improved, a random local double bridge kick is 
+    made. The kicked tour is kept if the search made it not worse than the 
+    best tour, otherwise the best tour is restored.
+    
+    The class reimplements BasicMethod.run function. Neighborhoods are not 
+    used by the method.
+
+    Attributes:
+        _neighbors_num: number of the nearest cities in the neighbor lists
+        _max_depth: maximum number of flips in one chain
+        _breadth: number of alternatives for the first added edge
+        _kick_length: maximum length of the parts moved by a kick
+        _report_interval: how often (in seconds) the current tour is sent to 
+            the main application
+        _epsilon: minimal gain of an improving chain
+        For other attributes please refer to BasicMethod class description
+    """
+    
+    _name = "Lin-Kernighan"
+    _short_name = "LK"
+    _type = "Metaheuristic"
+    _uses_neighborhood = False
+    _neighbors_num = 8
+    _max_depth = 50
+    _breadth = 5
+    _kick_length = 50
+    _report_interval = 0.5
+    _epsilon = 1e-9
+    
+    def _candidates(self, tour, t1, t2, g, forward, neighbors, added):
+        """Returns candidates for the next flip of a chain
+        
+        Args:
+            tour: ArrayTour object
+            t1: first city of the chain
+            t2: last city of the chain, tour neighbor of t1
+            g: partial gain of the chain
+            forward: True if t2 follows t1 in the tour
+            neighbors: neighbor lists
+            added: set of the edges added by the chain
+            
+        Returns:
+            List of tuples (g1, t3, t4) sorted by the gain of the flip, where 
+            g1 is a partial gain after edge (t2, t3) is added
+        """
+        d = self._distance_matrix
+        candidates = []
+        t2_next = tour.succ(t2) if forward else tour.pred(t2)
+        for t3 in neighbors[t2]:
+            g1 = g - d[t2, t3]
+            if g1<=self._epsilon:
+                break
+            if t3==t1 or t3==t2_next:
+                continue
+            t4 = tour.pred(t3) if forward else tour.succ(t3)
+            if frozenset((t3, t4)) in added:
+                continue
+            candidates.append((g1 + d[t3, t4], g1, t3, t4))
+        candidates.sort(reverse=True)
+        return [candidate[1:] for candidate in candidates]
+        
+    def _improve_city(self, tour, t1, neighbors):
+        """Looks for an improving Lin-Kernighan chain that starts at city t1
+        
+        Args:
+            tour: ArrayTour object
+            t1: city
+            neighbors: neighbor lists
+            
+        Returns:
+            Tuple (gain, cities), where gain is a decrease of the tour 
+            distance and cities are the endpoints of the changed edges. 
+            (0, None) if there is no improving chain.
+        """
+        d = self._distance_matrix
+        for t2 in (tour.succ(t1), tour.pred(t1)):
+            g = d[t1, t2]
+            forward = tour.succ(t1)==t2
+            first = self._candidates(tour, t1, t2, g, forward, neighbors, set())
+            for g1, t3, t4 in first[:self._breadth]:
+                flips, added = [], set()
+                best_gain, best_flips = 0, 0
+                cities = [t1, t2]
+                step = (g1, t3, t4)
+                last = t2
+                while step and len(flips)<self._max_depth:
+                    g1, t3, t4 = step
+                    tour.exchange(t1, last, t4, t3)
+                    flips.append((last, t3, t4))
+                    added.add(frozenset((last, t3)))
+                    cities += [t3, t4]
+                    g = g1 + d[t3, t4]
+                    closed_gain = g - d[t4, t1]
+                    if closed_gain>best_gain:
+                        best_gain, best_flips = closed_gain, len(flips)
+                    last = t4
+                    forward = tour.succ(t1)==last
+                    candidates = self._candidates(tour, t1, last, g, forward, 
+                                                  neighbors, added)
+                    step = candidates[0] if candidates else None
+                # undo the flips after the best closed tour
+                while len(flips)>best_flips:
+                    last, t3, t4 = flips.pop()
+                    tour.exchange(t1, t4, last, t3)
+                if best_gain>self._epsilon:
+                    return best_gain, cities
+                g = d[t1, t2]
+        return 0, None
+        
+    def _local_search(self, tour, queue, in_queue, neighbors, stat, start_time):
+        """Runs Lin-Kernighan steps until no city in the queue is improved
+        
+        Returns:
+            Tuple (gain, finished), where gain is an overall decrease of the 
+            tour distance, and finished is False if the run time limit has 
+            been reached.
+        """
+        total_gain = 0
+        while queue:
+            if time()-start_time > self._run_time_limit:
+                return total_gain, False
+            t1 = queue.popleft()
+            in_queue[t1] = False
+            gain, cities = self._improve_city(tour, t1, neighbors)
+            stat.overall_nodes_generated += 1
+            stat.overall_iterations += 1
+            if not cities:
+                continue
+            total_gain += gain
+            for city in cities:
+                if not in_queue[city]:
+                    in_queue[city] = True
+                    queue.append(city)
+        return total_gain, True
+        
+    def _kick(self, tour, queue, in_queue):
+        """Makes a random local double bridge move
+        
+        Returns:
+            Increase of the tour distance
+        """
+        d = self._distance_matrix
+        n = tour.cities_num
+        length = min(self._kick_length, (n - 2) // 3)
+        if length<1:
+            return 0
+        i = self._random.randint(n - 3*length - 1)
+        j = i + self._random.randint(1, length+1)
+        k = j + self._random.randint(1, length+1)
+        order = tour.order
+        a, b, c, e, f, g = order[i], order[i+1], order[j], order[j+1], order[k], order[(k+1)%n]
+        delta = d[a, e] + d[f, b] + d[c, g] - d[a, b] - d[c, e] - d[f, g]
+        tour.double_bridge(i, j, k)
+        for city in (a, b, c, e, f, g):
+            if not in_queue[city]:
+                in_queue[city] = True
+                queue.append(city)
+        return delta
+    
+    def run(self, input_state, stat=StatRecord()):
+        """Runs iterated Lin-Kernighan strategy to solve the TSP problem.
+        
+        Args:
+            Please refer to BasicMethod.run description
+            
+        Returns:
+            Please refer to BasicMethod.run description
+        """
+        start_time = time()
+        super(LinKernighan, self).run(input_state, stat)
+        
+        ever_found_best_state = input_state.copy()
+        state, value = input_state.copy(), self.calc_solution_cost(input_state)
+        stat.solution_cost = value
+        
+        neighbors = neighbor_lists(self._distance_matrix, self._neighbors_num)
+        cities = nearest_neighbor_tour(self._distance_matrix, neighbors, 
+                                       state._cities[0])
+        state.set_cities(cities)
+        constructed_value = self.calc_solution_cost(state)
+        if constructed_value<value:
+            value = constructed_value
+        else:
+            state.copy_from(input_state)
+        tour = ArrayTour(state._cities)
+        best_order, best_value = tour.order.copy(), value
+        
+        queue = deque(tour.cities())
+        in_queue = [True]*tour.cities_num
+        report_time = time()
+        while True:
+            gain, finished = self._local_search(tour, queue, in_queue, 
+                                                neighbors, stat, start_time)
+            value -= gain
+            if value<best_value - self._epsilon:
+                best_order, best_value = tour.order.copy(), value
+                state.set_cities(tour.cities())
+                # the tracked value is refreshed to avoid rounding drift
+                value = best_value = self.calc_solution_cost(state)
+                if best_value<stat.solution_cost:
+                    ever_found_best_state.copy_from(state)
+                    stat.solution_cost = best_value
+                    self.send_best_state(ever_found_best_state, best_value, stat)
+            elif value>best_value:
+                tour = ArrayTour(best_order)
+                value = best_value
+            self.send_current_cost(value, stat.solution_cost)
+            if time()-report_time > self._report_interval:
+                report_time = time()
+                state.set_cities(tour.cities())
+                self.send_state(state, value)
+            stat.overall_run_time = time() - start_time
+            if not finished:
+                break
+            delta = self._kick(tour, queue, in_queue)
+            if not queue:
+                return ever_found_best_state, "Local optimum is reached"
+            value += delta
+        
+        return ever_found_best_state, "Run time limit has been reached"
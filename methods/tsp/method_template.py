@@ -21,8 +21,11 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from basicmethod import BasicMethod
 from methods.statrecord import StatRecord
+from methods.trace import get_tracer
 from time import time
 
+_trace = get_tracer('new method')
+
 class NewMethod(BasicMethod):
     """Template class for a new method that solves the TSP problem.
 
@@ -114,7 +117,13 @@ class NewMethod(BasicMethod):
         # It will run until the running time limit is reached.
         #
         while True:
-            print '{:.2f}'.format(value)
+            #
+            # Don't print anything here: printing on each iteration slows down
+            # the method. Use a tracer instead (see methods/trace.py), it 
+            # costs nothing while it is turned off.
+            #
+            if _trace.enabled:
+                _trace.debug("iteration", value=value)
             
             #
             # On each iteration you should send to the main program the 
@@ -152,6 +161,11 @@ class NewMethod(BasicMethod):
             #        break
             #    state, value = best_state, best_value
             #
+            # Faster methods evaluate moves instead of neighbor states. Use
+            # self.iter_moves to get the moves, self.move_delta to get a cost 
+            # change after a move, and state.apply_move to make the move. 
+            # Check HillClimbing class in methods/tsp/hill.py for example.
+            #
             
             #
             # On each iteration you should send to the main program a new
@@ -174,6 +188,7 @@ class NewMethod(BasicMethod):
             # time statistics into statistic record.
             #
             stat.overall_nodes_generated += len(new_states)
+            stat.overall_iterations += 1
             stat.overall_run_time = time() - start_time
             
         #
@@ -5,6 +5,9 @@ There are several neighborhood classes:
     OnePointNeighborhood
     TwoPointNeighborhood
     TwoOptNeighborhood
+    FullTwoOptNeighborhood
+    OrOptNeighborhood
+    ThreeOptNeighborhood
 Check their descriptions for more details
 
 @author: Oleksii Molchanovskyi
@@ -26,7 +29,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from methods.neighborhood import BasicNeighborhood
-from numpy.random import randint
+from numpy import arange, full, triu_indices
 
 class OnePointNeighborhood(BasicNeighborhood):
     """One-point neighborhood for the TSP problem
@@ -48,8 +51,8 @@ class OnePointNeighborhood(BasicNeighborhood):
     _short_name = "One-point"
     _default = True
     
-    def get_neighbors(self, state):
-        """Returns a list of neighbor states for a state.
+    def iter_moves(self, state):
+        """Yields moves to neighbor states for a state.
         
         See class description for details.
         
@@ -57,20 +60,37 @@ class OnePointNeighborhood(BasicNeighborhood):
             state:
             
         Returns:
-            List of the states that are neighbors of the specified state 
-            according to the one-point neighborhood strategy 
-        """
-        neighbors = []
-        city_idx = randint(state.cities_num())
-        cities_tmp = state._cities[:]
-        city = cities_tmp.pop(city_idx)
-        for pos in range(state.cities_num()):
+            Iterator over the moves ('insert', city_idx, pos) to the neighbors 
+            of the specified state according to the one-point neighborhood 
+            strategy 
+        """
+        city_idx = self._random.randint(state.cities_num())
+        for pos in xrange(state.cities_num()):
             if pos!=city_idx:
-                new_state = state.copy()
-                new_state._cities[:] = cities_tmp[:]
-                new_state._cities.insert(pos, city)
-                neighbors.append(new_state)
-        return neighbors
+                yield ('insert', city_idx, pos)
+                
+    def get_move_batch(self, state):
+        """Returns the moves of the neighborhood as a batch.
+        
+        Please refer to BasicNeighborhood.get_move_batch description.
+        """
+        cities_num = state.cities_num()
+        city_idx = self._random.randint(cities_num)
+        positions = arange(cities_num)
+        positions = positions[positions!=city_idx]
+        return 'insert', full(len(positions), city_idx, dtype=int), positions
+        
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        Please refer to BasicNeighborhood.random_move description.
+        """
+        cities_num = state.cities_num()
+        if cities_num<2:
+            return None
+        city_idx = self._random.randint(cities_num)
+        pos = self._random.randint(cities_num-1)
+        return ('insert', city_idx, pos + (pos>=city_idx))
         
 class TwoPointNeighborhood(BasicNeighborhood):
     """Two-point neighborhood for the TSP problem
@@ -92,8 +112,8 @@ class TwoPointNeighborhood(BasicNeighborhood):
     _short_name = "Two-point"
     _default = False
     
-    def get_neighbors(self, state):
-        """Returns a list of neighbor states for a state.
+    def iter_moves(self, state):
+        """Yields moves to neighbor states for a state.
         
         See class description for details.
         
@@ -101,19 +121,37 @@ class TwoPointNeighborhood(BasicNeighborhood):
             state:
             
         Returns:
-            List of the states that are neighbors of the specified state 
-            according to the one-point neighborhood strategy 
+            Iterator over the moves ('swap', city_idx, pos) to the neighbors 
+            of the specified state according to the two-point neighborhood 
+            strategy 
         """
-        neighbors = []
-        city_idx = randint(state.cities_num())
-        city = state._cities[city_idx]
-        for pos in range(state.cities_num()):
+        city_idx = self._random.randint(state.cities_num())
+        for pos in xrange(state.cities_num()):
             if pos!=city_idx:
-                new_state = state.copy()
-                new_state._cities[city_idx] = new_state._cities[pos]
-                new_state._cities[pos] = city
-                neighbors.append(new_state)
-        return neighbors
+                yield ('swap', city_idx, pos)
+                
+    def get_move_batch(self, state):
+        """Returns the moves of the neighborhood as a batch.
+        
+        Please refer to BasicNeighborhood.get_move_batch description.
+        """
+        cities_num = state.cities_num()
+        city_idx = self._random.randint(cities_num)
+        positions = arange(cities_num)
+        positions = positions[positions!=city_idx]
+        return 'swap', full(len(positions), city_idx, dtype=int), positions
+        
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        Please refer to BasicNeighborhood.random_move description.
+        """
+        cities_num = state.cities_num()
+        if cities_num<2:
+            return None
+        city_idx = self._random.randint(cities_num)
+        pos = self._random.randint(cities_num-1)
+        return ('swap', city_idx, pos + (pos>=city_idx))
         
 class TwoOptNeighborhood(BasicNeighborhood):
     """Two-opt neighborhood for the TSP problem
@@ -141,8 +179,66 @@ class TwoOptNeighborhood(BasicNeighborhood):
     _short_name = "Two-opt"
     _default = False
     
-    def get_neighbors(self, state):
-        """Returns a list of neighbor states for a state.
+    def iter_moves(self, state):
+        """Yields moves to neighbor states for a state.
+        
+        See class description for details.
+        
+        Args:
+            state:
+            
+        Returns:
+            Iterator over the moves ('2opt', city_idx_1, city_idx_3) to the 
+            neighbors of the specified state according to the two-opt 
+            neighborhood strategy 
+        """
+        cities_num = state.cities_num()
+        city_idx_1 = self._random.randint(cities_num)
+        for i in xrange(cities_num-3):
+            yield ('2opt', city_idx_1, (city_idx_1 + 2 + i) % cities_num)
+            
+    def get_move_batch(self, state):
+        """Returns the moves of the neighborhood as a batch.
+        
+        Please refer to BasicNeighborhood.get_move_batch description.
+        """
+        cities_num = state.cities_num()
+        city_idx_1 = self._random.randint(cities_num)
+        moves_num = max(cities_num-3, 0)
+        return ('2opt', full(moves_num, city_idx_1, dtype=int), 
+                (city_idx_1 + 2 + arange(moves_num)) % cities_num)
+            
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        Please refer to BasicNeighborhood.random_move description.
+        """
+        cities_num = state.cities_num()
+        if cities_num<4:
+            return None
+        city_idx_1 = self._random.randint(cities_num)
+        i = self._random.randint(cities_num-3)
+        return ('2opt', city_idx_1, (city_idx_1 + 2 + i) % cities_num)
+            
+class FullTwoOptNeighborhood(BasicNeighborhood):
+    """Full two-opt neighborhood for the TSP problem
+    
+    The neighborhood contains all two-opt moves of the tour, i.e. for each 
+    pair of non-adjacent edges (i, i+1) and (j, j+1), i<j, the part of tour 
+    between positions i+1 and j is reversed. There are O(N^2) such moves, so 
+    the neighborhood is intended for methods that evaluate move batches 
+    (e.g. HillClimbing).
+    
+    Attributes:
+        Please refer to BasicNeighborhood class description
+    """
+    
+    _name = "Full two-opt move"
+    _short_name = "Full two-opt"
+    _default = False
+    
+    def iter_moves(self, state):
+        """Yields moves to neighbor states for a state.
         
         See class description for details.
         
@@ -150,21 +246,188 @@ class TwoOptNeighborhood(BasicNeighborhood):
             state:
             
         Returns:
-            List of the states that are neighbors of the specified state 
-            according to the one-point neighborhood strategy 
+            Iterator over the moves ('2opt', i, j) to the neighbors of the 
+            specified state according to the full two-opt neighborhood 
+            strategy 
+        """
+        cities_num = state.cities_num()
+        for i in xrange(cities_num-2):
+            for j in xrange(i+2, cities_num - (i==0)):
+                yield ('2opt', i, j)
+                
+    def get_move_batch(self, state):
+        """Returns the moves of the neighborhood as a batch.
+        
+        Please refer to BasicNeighborhood.get_move_batch description.
+        """
+        cities_num = state.cities_num()
+        first, second = triu_indices(cities_num, 2)
+        # edges (0, 1) and (N-1, 0) are adjacent
+        keep = (first!=0) | (second!=cities_num-1)
+        return '2opt', first[keep], second[keep]
+        
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        A random pair of positions is drawn until it is a pair of 
+        non-adjacent edges, so the moves are equally likely.
+        
+        Please refer to BasicNeighborhood.random_move description.
+        """
+        cities_num = state.cities_num()
+        if cities_num<4:
+            return None
+        while True:
+            i, j = sorted(self._random.randint(cities_num, size=2).tolist())
+            if j-i>=2 and (i!=0 or j!=cities_num-1):
+                return ('2opt', i, j)
+        
+def _segment_insertions(cities_num, i, j, reverse=True):
+    """Yields ('segment', i, j, k, rev) moves for all insertion positions k
+    
+    Args:
+        cities_num: number of cities
+        i: first position of the segment
+        j: last position of the segment
+        reverse: if True then moves with the reversed segment are yielded too
+    """
+    reversals = (False, True) if reverse and j>i else (False,)
+    for k in xrange(cities_num):
+        # the segment could not be inserted into itself or to the same place
+        if i-1<=k<=j or k==(i-1)%cities_num:
+            continue
+        for rev in reversals:
+            yield ('segment', i, j, k, rev)
+            
+def _random_segment_insertion(random, cities_num, i, j, reverse=True):
+    """Returns a random move of _segment_insertions function
+    
+    The insertion position is drawn until the segment could be inserted 
+    there, so the positions are equally likely.
+    
+    Args:
+        random: numpy RandomState object
+        cities_num: number of cities
+        i: first position of the segment
+        j: last position of the segment; j-i should be less than 
+            cities_num-2
+        reverse: if True then the segment could be reversed
+    """
+    while True:
+        k = random.randint(cities_num)
+        if not (i-1<=k<=j or k==(i-1)%cities_num):
+            break
+    rev = bool(reverse and j>i and random.randint(2))
+    return ('segment', i, j, k, rev)
+        
+class OrOptNeighborhood(BasicNeighborhood):
+    """Or-opt neighborhood for the TSP problem
+    
+    For a given state we randomly select a position of the tour. Then the
+    segments of 1, 2 and 3 cities that start at this position are relocated 
+    to all other places of the tour, as they are and reversed.
+    For instance having a tour [0, 1, 2, 3, 4, 5] and the selected position 
+    #1 the segment [1, 2] gives next new states (tours):
+        [0, 3, 1, 2, 4, 5]
+        [0, 3, 2, 1, 4, 5]
+        [0, 3, 4, 1, 2, 5]
+        ...
+    
+    Attributes:
+        _max_length: maximum length of the relocated segment
+        _reverse: if True then reversed segments are relocated too
+        Please refer to BasicNeighborhood class description
+    """
+    
+    _name = "Or-opt move"
+    _short_name = "Or-opt"
+    _default = False
+    _max_length = 3
+    _reverse = True
+    
+    def iter_moves(self, state):
+        """Yields moves to neighbor states for a state.
+        
+        See class description for details.
+        
+        Args:
+            state:
+            
+        Returns:
+            Iterator over the moves ('segment', i, j, k, reverse) to the 
+            neighbors of the specified state according to the Or-opt 
+            neighborhood strategy 
+        """
+        cities_num = state.cities_num()
+        i = self._random.randint(cities_num)
+        for length in xrange(1, self._max_length+1):
+            j = i + length - 1
+            if j>=cities_num or length>cities_num-3:
+                break
+            for move in _segment_insertions(cities_num, i, j, self._reverse):
+                yield move
+                
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        Please refer to BasicNeighborhood.random_move description.
+        """
+        cities_num = state.cities_num()
+        i = self._random.randint(cities_num)
+        max_length = min(self._max_length, cities_num-3, cities_num-i)
+        if max_length<1:
+            return None
+        j = i + self._random.randint(max_length)
+        return _random_segment_insertion(self._random, cities_num, i, j, 
+                                         self._reverse)
+        
+class ThreeOptNeighborhood(BasicNeighborhood):
+    """Three-opt segment insertion neighborhood for the TSP problem
+    
+    For a given state we randomly select a segment of the tour of any 
+    length. Then the segment is relocated to all other places of the tour, 
+    as it is and reversed. Each such move replaces three edges of the tour.
+    
+    Attributes:
+        _reverse: if True then reversed segments are relocated too
+        Please refer to BasicNeighborhood class description
+    """
+    
+    _name = "Three-opt segment insertion"
+    _short_name = "Three-opt"
+    _default = False
+    _reverse = True
+    
+    def iter_moves(self, state):
+        """Yields moves to neighbor states for a state.
+        
+        See class description for details.
+        
+        Args:
+            state:
+            
+        Returns:
+            Iterator over the moves ('segment', i, j, k, reverse) to the 
+            neighbors of the specified state according to the three-opt 
+            segment insertion neighborhood strategy 
+        """
+        cities_num = state.cities_num()
+        if cities_num<4:
+            return
+        length = self._random.randint(1, cities_num-2)
+        i = self._random.randint(cities_num - length + 1)
+        for move in _segment_insertions(cities_num, i, i+length-1, self._reverse):
+            yield move
+            
+    def random_move(self, state):
+        """Returns a random move to a neighbor state.
+        
+        Please refer to BasicNeighborhood.random_move description.
         """
-        neighbors = []
         cities_num = state.cities_num()
-        city_idx_1 = randint(cities_num)
-        city_1 = state._cities[city_idx_1]
-        city_idx_2 = (city_idx_1 + 1) % cities_num
-        double_cities = 2*state._cities
-        for i in range(cities_num-3):
-            city_idx_3 = city_idx_2 + 1 + i
-            city_idx_4 = city_idx_3 + 1
-            new_state = state.copy()
-            middle = double_cities[city_idx_2:city_idx_3+1]
-            middle.reverse()
-            new_state._cities[:] = [city_1] + middle[:] + double_cities[city_idx_4:city_idx_1+cities_num]
-            neighbors.append(new_state)
-        return neighbors
\ No newline at end of file
+        if cities_num<4:
+            return None
+        length = self._random.randint(1, cities_num-2)
+        i = self._random.randint(cities_num - length + 1)
+        return _random_segment_insertion(self._random, cities_num, i, 
+                                         i+length-1, self._reverse)
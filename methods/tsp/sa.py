@@ -1,8 +1,10 @@
 #!/usr/bin/env python
-"""Contains a class that implements Simulated Annealing method for the TSP.
+"""Contains classes that implement Simulated Annealing methods for the TSP.
 
 Class SimulatedAnnealing tries to solve the TSP problem with Simulated 
 Annealing metaheuristic searching method. Tabu is inherited from BasicMethod.
+Class IslandSimulatedAnnealing runs several annealing processes (islands) 
+at once; the islands periodically exchange their best tours.
 
 @author: Oleksii Molchanovskyi
 @organization: Kyiv Polytechnic Institute
@@ -24,106 +26,401 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from basicmethod import BasicMethod
 from methods.statrecord import StatRecord
+from methods.trace import get_tracer
+from methods.pipes import wait
+from multiprocessing import Process, Pipe, cpu_count
 from time import time
-from numpy.random import shuffle, random
-from numpy import exp
+from numpy import exp, log
+
+_trace = get_tracer('sa')
 
 class SimulatedAnnealing(BasicMethod):
     """Simulated Annealing metaheuristic method implementation for the TSP.
     
+    The temperature is lowered by one of the cooling schedules:
+        linear: linear decay to zero in _time_max iterations
+        geometric: T = T0*alpha^t
+        lundy-mees: T = T0/(1 + beta*T0*t)
+        time: T = T0*(_temp_ratio)^(elapsed time/run time limit), so the 
+            minimal temperature is reached at the end of the run
+    By default alpha and beta are chosen so the minimal temperature 
+    T0*_temp_ratio is reached in _time_max iterations. Here t is a number of 
+    iterations since the start (or the last reheating). The time schedule 
+    is the default one, so the whole run time limit is spent on annealing; 
+    the iteration based schedules turn into a greedy descent after 
+    _time_max iterations.
+    
+    On every iteration random moves are drawn from the neighborhoods until 
+    one of them is accepted, at most _attempts of them, so the neighborhoods 
+    are never built as a whole. Only when the temperature is zero and no 
+    random move is accepted the moves are looked through for an improving 
+    one, to tell if the state is a local optimum.
+    
+    If reheating is on then after _reheat_after iterations without an 
+    improvement of the best state the schedule starts over from the 
+    temperature T0*_reheat_ratio, where T0 is the start temperature of the 
+    current schedule. So every next reheating is cooler.
+    
     The class reimplements BasicMethod.run function.
 
     Attributes:
-        _time_max: maximum time of annealing process
-        _temp_max: maximum temperature of annealing
+        _cooling: name of the cooling schedule
+        _time_max: number of iterations of the iteration based schedules
+        _temp_max: initial temperature T0; if None then it is chosen so that 
+            an average worsening move of _temp_samples random moves is 
+            accepted with _initial_acceptance probability
+        _initial_acceptance: see _temp_max
+        _temp_samples: see _temp_max
+        _attempts: maximum number of random moves tried on an iteration; if 
+            None then it is equal to the number of cities
+        _temp_ratio: ratio of the minimal and initial temperature
+        _alpha: cooling factor of the geometric schedule
+        _beta: cooling parameter of the Lundy-Mees schedule
+        _reheat_after: number of iterations without improvement of the best 
+            state before reheating; reheating is off if it is 0
+        _reheat_ratio: ratio of the reheating and initial temperature
+        _schedule: current schedule parameters - tuple (T0, t0, time0, 
+            end_time) of the schedule start temperature, iteration and time, 
+            and the end time of the run
+        _improved_t: last iteration that improved the best state
         For other attributes please refer BasicMethod class description.  
     """
     
     _name = "Simulated annealing"
     _short_name = "SA"
     _type = "Metaheuristic"
+    _options = ('cooling', 'time_max', 'alpha', 'beta', 'reheat_after')
+    _coolings = ('linear', 'geometric', 'lundy-mees', 'time')
+    _cooling = 'time'
     _time_max = 1000
-    _temp_max = 10000
+    _temp_max = None
+    _initial_acceptance = 0.5
+    _temp_samples = 100
+    _attempts = None
+    _temp_ratio = 1e-3
+    _alpha = None
+    _beta = None
+    _reheat_after = 0
+    _reheat_ratio = 0.5
+    _schedule = None
+    _improved_t = 0
     
-    def _temperature(self, t):
-        """Calulcates temperature based on time t"""
-#        print t, self._time_max, self._temp_max
-        T = t*float(-self._temp_max)/self._time_max + self._temp_max
-        if T<0:
-            return 0
-        return T
+    def _initial_temperature(self, state):
+        """Returns the initial temperature for the state
+        
+        Please refer to _temp_max attribute description.
+        """
+        if self._temp_max:
+            return self._temp_max
+        moves = [self.random_move(state) for index in xrange(self._temp_samples)]
+        deltas = [self.move_delta(state, move) for move in moves 
+                  if move is not None]
+        deltas = [delta for delta in deltas if delta>0]
+        if not deltas:
+            return self.calc_solution_cost(state)/state.cities_num()
+        return -sum(deltas)/len(deltas)/log(self._initial_acceptance)
+        
+    def _start_schedule(self, temperature, t, start_time, end_time):
+        """Starts the cooling schedule from the temperature
+        
+        Args:
+            temperature: initial temperature of the schedule
+            t: current iteration
+            start_time: current time
+            end_time: time when the run should be finished
+        """
+        if self._cooling not in self._coolings:
+            raise ValueError("Unknown cooling schedule: %s" % self._cooling)
+        self._schedule = (temperature, t, start_time, end_time)
+        self._improved_t = t
     
-    def _probability(self, delta, t):
+    def _temperature(self, t, now):
+        """Calulcates temperature based on iteration t and time now"""
+        T0, t0, time0, end_time = self._schedule
+        if self._cooling=='linear':
+            return max(0, T0*(1 - float(t - t0)/self._time_max))
+        elif self._cooling=='geometric':
+            alpha = self._alpha or self._temp_ratio**(1./self._time_max)
+            return T0*alpha**(t - t0)
+        elif self._cooling=='lundy-mees':
+            beta = self._beta or (1./self._temp_ratio - 1)/(self._time_max*T0)
+            return T0/(1 + beta*T0*(t - t0))
+        fraction = min(1, (now - time0)/max(end_time - time0, 1e-9))
+        return T0*self._temp_ratio**fraction
+    
+    def _probability(self, delta, T):
         """Returns probability of acceptance of a difference between two states
         
         Args:
             delta: difference between costs of two state (tours)
-            t: running time (in amount of iterations)
+            T: temperature
             
         Returns:
             Probability value from 0 to 1
         """
         if delta<0:
-            print delta, t, "1"
             return 1
         else:
-            T = self._temperature(t)
             if T<=0:
                 return 0
             P = exp(-delta/T)
-            print delta, t, P, T
+            if _trace.enabled:
+                _trace.debug("probability", delta=delta, P=P, T=T)
             if P>1:
                 P = 1
             elif P<0:
                 P = 0
             return P
     
-    def run(self, input_state, stat=StatRecord()):
-        """Runs simulated annealing strategy to solve the TSP problem.
+    def _anneal(self, state, value, t, stat, best_state, start_time, end_time):
+        """Makes annealing iterations until the end time
+        
+        The cooling schedule should be started before the first call.
         
         Args:
-            Please refer to BasicMethod.run description
+            state: current state; it is changed in place
+            value: cost of the current state
+            t: running time (in amount of iterations)
+            stat: statistics record; its solution cost is the cost of the 
+                best state
+            best_state: ever found best state; it is changed in place
+            start_time: time when the run has been started
+            end_time: time when the iterations should be stopped
             
         Returns:
-            Please refer to BasicMethod.run description
+            Tuple (value, t, frozen), where value is the cost of the current 
+            state, t is the running time and frozen is True if the 
+            temperature is zero and no move has been accepted (so the 
+            annealing can't be continued)
         """
-        start_time = time()
-        super(SimulatedAnnealing, self).run(input_state, stat)
-        
-        self._tabu_list_limit = input_state.cities_num()*100
-        ever_found_best_state = input_state.copy()
-        state, value = input_state.copy(), self.calc_solution_cost(input_state)
-        stat.solution_cost = value
-        t = 0
-        self._temp_max = value
         while(True):
 #            print '{:.2f}'.format(value)
             self.send_current_cost(value, stat.solution_cost)
-            if time()-start_time > self._run_time_limit:
-                return ever_found_best_state, "Run time limit has been reached"
+            now = time()
+            if now > end_time:
+                return value, t, False
+            if self._reheat_after and t - self._improved_t>=self._reheat_after:
+                self._start_schedule(self._reheat_ratio*self._schedule[0], t, 
+                                     now, self._schedule[3])
+            T = self._temperature(t, now)
                 
-            new_states = self.get_neighbors(state)
-            shuffle(new_states)
-            best_state, best_value = None, float('inf')
-            for new_state in new_states:
-                v = self.calc_solution_cost(new_state)
-                if self._probability(v - value, t)>random():
-                    best_state, best_value = new_state, v
+            best_move, best_delta = None, 0
+            moves_num = 0
+            for attempt in xrange(self._attempts or state.cities_num()):
+                move = self.random_move(state)
+                if move is None:
                     break
-            if not best_state:
-                break
-            
+                moves_num += 1
+                delta = self.move_delta(state, move)
+                if self._probability(delta, T)>self._random.random_sample():
+                    best_move, best_delta = move, delta
+                    break
+            if best_move is None and T<=0:
+                for move in self.iter_moves(state):
+                    moves_num += 1
+                    delta = self.move_delta(state, move)
+                    if delta<-self._epsilon:
+                        best_move, best_delta = move, delta
+                        break
+            stat.overall_nodes_generated += moves_num
+            stat.overall_iterations += 1
             t += 1
+            if not best_move:
+                if T<=0:
+                    return value, t, True
+                continue
             
-            state, value = best_state, best_value
+            state.apply_move(best_move)
+            value = self.update_cost(state, value, best_delta, t)
             self.send_state(state, value)
 #            print state, value
-            if value<stat.solution_cost:
-                ever_found_best_state.copy_from(state)
+            if value<stat.solution_cost - self._epsilon:
+                best_state.copy_from(state)
                 stat.solution_cost = value
-                self.send_best_state(ever_found_best_state, value, stat)
+                self._improved_t = t
+                self.send_best_state(best_state, value, stat)
             
-            stat.overall_nodes_generated += len(new_states)
             stat.overall_run_time = time() - start_time
+    
+    def run(self, input_state, stat=StatRecord()):
+        """Runs simulated annealing strategy to solve the TSP problem.
+        
+        Args:
+            Please refer to BasicMethod.run description
+            
+        Returns:
+            Please refer to BasicMethod.run description
+        """
+        start_time = time()
+        super(SimulatedAnnealing, self).run(input_state, stat)
+        
+        ever_found_best_state = input_state.copy()
+        state, value = input_state.copy(), self.calc_solution_cost(input_state)
+        stat.solution_cost = value
+        end_time = start_time + self._run_time_limit
+        self._start_schedule(self._initial_temperature(state), 0, start_time, 
+                             end_time)
+        value, t, frozen = self._anneal(state, value, 0, stat, 
+                                        ever_found_best_state, start_time, 
+                                        end_time)
+        if frozen:
+            return ever_found_best_state, "Local optimum is reached"
+        return ever_found_best_state, "Run time limit has been reached"
+
+class AnnealingIsland(Process):
+    """Process that runs simulated annealing for one island
+    
+    The island periodically sends its best state to the parent process as 
+    ("best", state, value, stat, current_value) message and then receives 
+    ("migrant", state, value) reply; the parent replies to every "best" 
+    message at once, and the state is None if there is no migrant. A migrant 
+    replaces the current state of the island if it is better. When the 
+    annealing is over the island sends ("finish", state, value, stat, frozen)
+    message. The states are packed with their pack function and the stat is 
+    a StatRecord object of the island.
+    
+    Only one message is in the pipe at a time, so the island and the parent 
+    never block each other in send function.
+    
+    Attributes:
+        method: SimulatedAnnealing object
+        state: initial state
+        conn: Pipe connection to the parent process
+        seed: random seed of the island
+        interval: time between the migrations (in seconds)
+    """
+    
+    def __init__(self, method, state, conn, seed, interval):
+        Process.__init__(self)
+        self.method = method
+        self.state = state.copy()
+        self.conn = conn
+        self.seed = seed
+        self.interval = interval
+        self.daemon = True
+        
+    def run(self):
+        method, conn, state = self.method, self.conn, self.state
+        method.init_random(self.seed)
+        method.set_connection(None)
+        start_time = time()
+        end_time = start_time + method._run_time_limit
+        stat = StatRecord()
+        value = stat.solution_cost = method.calc_solution_cost(state)
+        best_state = state.copy()
+        method._start_schedule(method._initial_temperature(state), 0, 
+                               start_time, end_time)
+        t, frozen = 0, False
+        try:
+            while not frozen and time()<end_time:
+                value, t, frozen = method._anneal(
+                    state, value, t, stat, best_state, start_time, 
+                    min(time() + self.interval, end_time))
+                conn.send(("best", best_state.pack(), stat.solution_cost, stat, 
+                           value))
+                msg, migrant, migrant_value = conn.recv()
+                if migrant is not None and migrant_value<value - method._epsilon:
+                    state.copy_from(state.unpack(migrant))
+                    value = migrant_value
+                    frozen = False
+            conn.send(("finish", best_state.pack(), stat.solution_cost, stat, 
+                       frozen))
+        except (IOError, EOFError):
+            return
+
+class IslandSimulatedAnnealing(SimulatedAnnealing):
+    """Island model of the Simulated Annealing method for the TSP.
+    
+    Each island is a separate process that anneals its own copy of the 
+    initial state with its own random seed and with the annealing options 
+    of the method. The islands are connected into 
+    a ring: every migration interval an island sends its best state to the 
+    run process and gets the best state of the previous island in return.
+    
+    The class reimplements SimulatedAnnealing.run function.
+
+    Attributes:
+        _islands: number of the islands; if None then it is equal to the 
+            number of processor cores
+        _migration_interval: time between the migrations (in seconds)
+        For other attributes please refer SimulatedAnnealing class 
+        description.  
+    """
+    
+    _name = "Island simulated annealing"
+    _short_name = "ISA"
+    _type = "Metaheuristic"
+    _options = SimulatedAnnealing._options + ('islands', 'migration_interval')
+    _uses_processes = True
+    _islands = None
+    _migration_interval = 1.0
+    
+    def _sum_island_stats(self, stats, stat):
+        """Sums the counters of the islands statistics into the stat"""
+        stat.overall_nodes_generated = sum(s.overall_nodes_generated 
+                                           for s in stats)
+        stat.overall_iterations = sum(s.overall_iterations for s in stats)
+    
+    def run(self, input_state, stat=StatRecord()):
+        """Runs island simulated annealing strategy to solve the TSP problem.
+        
+        Args:
+            Please refer to BasicMethod.run description
+            
+        Returns:
+            Please refer to BasicMethod.run description
+        """
+        start_time = time()
+        super(SimulatedAnnealing, self).run(input_state, stat)
+        
+        ever_found_best_state = input_state.copy()
+        stat.solution_cost = self.calc_solution_cost(input_state)
+        islands_num = self._islands or cpu_count()
+        connections, islands = [], []
+        for index in range(islands_num):
+            parent_conn, child_conn = Pipe()
+            connections.append(parent_conn)
+            islands.append(AnnealingIsland(self, input_state, child_conn, 
+                                           self._random.randint(1<<31), 
+                                           self._migration_interval))
+        for island in islands:
+            island.start()
+            
+        # the last reported packed best states and values of the islands
+        migrants = [(None, float('inf'))]*islands_num
+        stats = [StatRecord() for index in range(islands_num)]
+        finished = {}
+        while len(finished)<islands_num:
+            wait([conn for index, conn in enumerate(connections) 
+                  if not finished.has_key(index)], self._migration_interval)
+            for index, conn in enumerate(connections):
+                if finished.has_key(index):
+                    continue
+                if not conn.poll():
+                    if not islands[index].is_alive() and not conn.poll():
+                        # the island has been stopped without a report
+                        finished[index] = False
+                    continue
+                msg = conn.recv()
+                packed, value, stats[index] = msg[1:4]
+                if value<stat.solution_cost - self._epsilon:
+                    ever_found_best_state.copy_from(input_state.unpack(packed))
+                    stat.solution_cost = value
+                    self._sum_island_stats(stats, stat)
+                    stat.overall_run_time = time() - start_time
+                    self.send_best_state(ever_found_best_state, value, stat)
+                if msg[0]=="finish":
+                    finished[index] = msg[4]
+                    continue
+                self.send_current_cost(msg[4], stat.solution_cost)
+                migrants[index] = (packed, value)
+                migrant, migrant_value = migrants[index - 1]
+                conn.send(("migrant", migrant, migrant_value))
+        for island in islands:
+            island.join()
             
-        return ever_found_best_state, "Local optimum is reached"
\ No newline at end of file
+        self._sum_island_stats(stats, stat)
+        stat.overall_run_time = time() - start_time
+        if all(finished.values()):
+            return ever_found_best_state, "Local optimum is reached"
+        return ever_found_best_state, "Run time limit has been reached"
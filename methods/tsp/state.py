@@ -2,7 +2,7 @@
 """Contains state class for the TSP problem.
 
 Contains class TspState that defines a state in the searching space of 
-the TSP problem.
+the TSP problem, and class TspArrayState that stores a tour in a numpy array.
 
 @author: Oleksii Molchanovskyi
 @organization: Kyiv Polytechnic Institute
@@ -22,9 +22,9 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from copy import deepcopy
 from methods.state import State
-from numpy.random import shuffle
+from numpy import arange, array_equal, asarray, frombuffer, int32
+import numpy.random
 
 class TspState(State):
     """TspState class. Inherited from the State class.
@@ -36,14 +36,26 @@ class TspState(State):
     For instance if we have N=5 cities then _cities could be:
         _cities = [0, 3, 2, 4, 1]
     
+    The state supports next moves (i, j and pos are positions in the tour):
+        ('insert', i, pos) - the city at position i is removed from the tour 
+            and inserted back at position pos
+        ('swap', i, j) - the cities at positions i and j are swapped
+        ('2opt', i, j) - the edges after positions i and j are replaced, so 
+            the part of tour between positions i+1 and j is reversed; j could 
+            be less than i, then the part wraps around the end of the tour
+        ('segment', i, j, k, reverse) - the part of tour between positions 
+            i and j (i<=j) is moved between positions k and k+1, where k is 
+            out of the part and k+1 is not i; the part is reversed if 
+            reverse is True
+        ('state', state) - the tour is replaced with the tour of the state
+    
     Attributes:
         _cities: list of all queens row numbers
         _cities_num: number of cities
     """
-    _cities = []
-    _cities_num = 0
+    __slots__ = ('_cities', '_cities_num')
     
-    def __init__(self, cities_num, is_empty=True):
+    def __init__(self, cities_num, is_empty=True, generator=numpy.random):
         """Inits state with some tour.
         
         The simplest tour [0, 1, 2, ..., N-1] tour is used for init.
@@ -51,47 +63,246 @@ class TspState(State):
         Args:
             cities_num: number of cities
             is_empty: not used
+            generator: numpy RandomState object that shuffles the tour; the 
+                global numpy random generator by default
         """
         self._cities_num = cities_num
         self._cities = [i for i in range(cities_num)]
-        shuffle(self._cities)
+        generator.shuffle(self._cities)
             
-    def random_generate(self, cities_num):
+    def random_generate(self, cities_num, generator=numpy.random):
         """Generates random tour
         
         The state is filled with randomly shuffled list [0, 1, 2, ..., N-1]
         
         Args:
             cities_num: number of cities
+            generator: numpy RandomState object
         """
-        state = self.__class__(cities_num, is_empty=False)
-        shuffle(state._cities)
-        return state
+        return self.__class__(cities_num, is_empty=False, generator=generator)
         
-    def randomize(self):
+    def randomize(self, generator=numpy.random):
         """Generates random tour
         
         Randomizes already existed tour
+        
+        Args:
+            generator: numpy RandomState object
         """
         self._cities = [i for i in range(self._cities_num)]
-        shuffle(self._cities)
+        generator.shuffle(self._cities)
         
     def copy_from(self, state):
         """Copies this state from the outer one"""
         self._cities[:] = state._cities[:]
             
+    def set_cities(self, cities):
+        """Replaces the tour with a sequence of cities"""
+        self._cities[:] = list(cities)
+            
     def cities_num(self):
         """Returns the number of cities"""
         return len(self._cities)
         
     def copy(self):
         """Returns a copy of this state"""
-        return deepcopy(self)
+        state = self.__class__.__new__(self.__class__)
+        state._cities_num = self._cities_num
+        state._cities = self._cities[:]
+        if hasattr(self, '__dict__'):
+            state.__dict__.update(self.__dict__)
+        return state
+        
+    def __getstate__(self):
+        """Returns the slots values for pickling"""
+        return self._cities, self._cities_num, getattr(self, '__dict__', None)
+        
+    def __setstate__(self, state):
+        """Restores the slots values after unpickling"""
+        self._cities, self._cities_num, attributes = state
+        if attributes:
+            self.__dict__.update(attributes)
         
     def __eq__(self, state):
         """Checks if a state is equal to this state"""
         return self._cities==state._cities
         
+    def pack(self):
+        """Returns the tour as a string of int32 numbers"""
+        return asarray(self._cities, dtype=int32).tobytes()
+        
+    @classmethod
+    def unpack(cls, data):
+        """Creates a state from the tour packed by pack function"""
+        state = cls.__new__(cls)
+        state.set_packed_cities(frombuffer(data, dtype=int32))
+        return state
+        
+    def set_packed_cities(self, cities):
+        """Sets the tour from an unpacked int32 array"""
+        self._cities_num = len(cities)
+        self._cities = cities.tolist()
+        
+    def apply_move(self, move):
+        """Applies a move to this tour in place
+        
+        See class description for the supported moves.
+        
+        Args:
+            move: move descriptor
+        """
+        kind = move[0]
+        if kind=='state':
+            self.copy_from(move[1])
+            return
+        if kind=='segment':
+            self._move_segment(*move[1:])
+            return
+        i, j = move[1:]
+        cities = self._cities
+        if kind=='insert':
+            cities.insert(j, cities.pop(i))
+        elif kind=='swap':
+            cities[i], cities[j] = cities[j], cities[i]
+        elif kind=='2opt':
+            if i<j:
+                cities[i+1:j+1] = cities[i+1:j+1][::-1]
+            else:
+                # reversing of the rest of the tour gives the same cycle
+                cities[j+1:i+1] = cities[j+1:i+1][::-1]
+        else:
+            raise ValueError("Unknown move: %r" % (move,))
+            
+    def _move_segment(self, i, j, k, reverse):
+        """Applies ('segment', i, j, k, reverse) move, see apply_move"""
+        cities = self._cities
+        segment = list(cities[i:j+1])
+        if reverse:
+            segment.reverse()
+        if k>j:
+            cities[i:k+1] = list(cities[j+1:k+1]) + segment
+        else:
+            cities[k+1:j+1] = segment + list(cities[k+1:i])
+            
+    def move_edges(self, move):
+        """Returns the edges that are changed by a move
+        
+        Args:
+            move: move descriptor
+            
+        Returns:
+            Tuple (removed, added) of lists of the edges that are removed from 
+            and added to the tour by the move. Each edge is a pair of cities.
+        """
+        cities = self._cities
+        n = len(cities)
+        if move[0]=='segment':
+            i, j, k, reverse = move[1:]
+            prev_city, next_city = cities[i-1], cities[(j+1)%n]
+            a, b = cities[k], cities[(k+1)%n]
+            first, last = cities[i], cities[j]
+            if reverse:
+                first, last = last, first
+            return ([(prev_city, cities[i]), (cities[j], next_city), (a, b)], 
+                    [(prev_city, next_city), (a, first), (last, b)])
+        kind, i, j = move
+        if kind=='insert':
+            city, prev_city, next_city = cities[i], cities[i-1], cities[(i+1)%n]
+            # the city is inserted between positions j-1 and j of the tour 
+            # without the city
+            a, b = (j-1)%(n-1), j%(n-1)
+            a = cities[a if a<i else a+1]
+            b = cities[b if b<i else b+1]
+            if a==prev_city and b==next_city:
+                return [], []
+            return ([(prev_city, city), (city, next_city), (a, b)], 
+                    [(prev_city, next_city), (a, city), (city, b)])
+        elif kind=='swap':
+            positions = set([(i-1)%n, i, (j-1)%n, j])
+            moved = {i: cities[j], j: cities[i]}
+            removed, added = [], []
+            for k in positions:
+                l = (k+1)%n
+                removed.append((cities[k], cities[l]))
+                added.append((moved.get(k, cities[k]), moved.get(l, cities[l])))
+            return removed, added
+        elif kind=='2opt':
+            a, b = cities[i], cities[(i+1)%n]
+            c, d = cities[j], cities[(j+1)%n]
+            return [(a, b), (c, d)], [(a, c), (b, d)]
+        raise ValueError("Unknown move: %r" % (move,))
+        
+    def to_string(self):
+        """Converts this state to string representation"""
+        return str(self._cities)
+        
+class TspArrayState(TspState):
+    """TspArrayState class. Inherited from the TspState class.
+    
+    The state has the same interface as TspState, but the tour is stored in 
+    a numpy int32 array instead of a list. A copy of the state is a single 
+    memory copy of the array, so the state is cheaper for large tours.
+    
+    Attributes:
+        _cities: numpy int32 array of the cities of the tour
+        _cities_num: number of cities
+    """
+    __slots__ = ()
+    
+    def __init__(self, cities_num, is_empty=True, generator=numpy.random):
+        """Inits state with some tour.
+        
+        Args:
+            cities_num: number of cities
+            is_empty: not used
+            generator: numpy RandomState object that shuffles the tour
+        """
+        self._cities_num = cities_num
+        self._cities = arange(cities_num, dtype=int32)
+        generator.shuffle(self._cities)
+        
+    def randomize(self, generator=numpy.random):
+        """Generates random tour
+        
+        Randomizes already existed tour
+        
+        Args:
+            generator: numpy RandomState object
+        """
+        self._cities = arange(self._cities_num, dtype=int32)
+        generator.shuffle(self._cities)
+        
+    def copy(self):
+        """Returns a copy of this state"""
+        state = super(TspArrayState, self).copy()
+        state._cities = self._cities.copy()
+        return state
+        
+    def __eq__(self, state):
+        """Checks if a state is equal to this state"""
+        return array_equal(self._cities, state._cities)
+        
+    def set_packed_cities(self, cities):
+        """Sets the tour from an unpacked int32 array"""
+        self._cities_num = len(cities)
+        self._cities = cities.copy()
+        
+    def apply_move(self, move):
+        """Applies a move to this tour in place
+        
+        Please refer to TspState.apply_move description.
+        """
+        if move[0]!='insert':
+            return super(TspArrayState, self).apply_move(move)
+        i, j = move[1:]
+        cities = self._cities
+        city = cities[i]
+        if i<j:
+            cities[i:j] = cities[i+1:j+1]
+        else:
+            cities[j+1:i+1] = cities[j:i]
+        cities[j] = city
+        
     def to_string(self):
         """Converts this state to string representation"""
-        return str(self._cities)
\ No newline at end of file
+        return str(self._cities.tolist())
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
-"""Contains a class that implements Tabu method for the TSP problem.
+"""Contains classes that implement Tabu methods for the TSP problem.
 
 Class Tabu tries to solve the TSP problem with Tabu metaheuristic 
-searching method. Tabu is inherited from BasicMethod.
+searching method. Tabu is inherited from BasicMethod. Class AttributeTabu 
+is inherited from BasicMethod too; it prohibits the moves by the changed 
+edges instead of the visited tours.
 
 @author: Oleksii Molchanovskyi
 @organization: Kyiv Polytechnic Institute
@@ -24,33 +26,96 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from basicmethod import BasicMethod
 from methods.statrecord import StatRecord
+from collections import deque
 from time import time
-from numpy.random import randint
+from numpy.random import RandomState
+
+class TourHash(object):
+    """Zobrist-like hash of the TSP tours.
+    
+    Every city gets a random 64-bit key, an edge key is a product of the keys 
+    of its cities, and a tour hash is a XOR of the keys of all its edges. So 
+    the hash does not depend on the tour start and direction, and it is 
+    updated in constant time by the edges that are changed by a move.
+    
+    Attributes:
+        _keys: random keys of the cities
+    """
+    
+    _mask = (1<<64) - 1
+    
+    def __init__(self, cities_num, seed=None):
+        """Inits random keys for cities_num cities"""
+        keys = RandomState(seed).randint(1, 1<<62, size=cities_num)
+        self._keys = [(int(key)<<1) | 1 for key in keys]
+        
+    def edge(self, a, b):
+        """Returns key of the edge (a, b)"""
+        return (self._keys[a]*self._keys[b]) & self._mask
+        
+    def tour(self, state):
+        """Returns hash of a tour that is described by state"""
+        cities = state._cities
+        value = 0
+        prev_city = cities[-1]
+        for city in cities:
+            value ^= self.edge(prev_city, city)
+            prev_city = city
+        return value
+        
+    def moved(self, value, state, move):
+        """Returns hash of the state tour after a move
+        
+        Args:
+            value: hash of the state tour
+            state: input state
+            move: move descriptor
+        """
+        if move[0]=='state':
+            return self.tour(move[1])
+        removed, added = state.move_edges(move)
+        for a, b in removed:
+            value ^= self.edge(a, b)
+        for a, b in added:
+            value ^= self.edge(a, b)
+        return value
 
 class Tabu(BasicMethod):
     """Tabu metaheuristic method implementation for the TSP problem.
     
-    The class reimplements BasicMethod.run function.
+    The class reimplements BasicMethod.run function. Visited tours are stored 
+    in the tabu memory as TourHash values, so a check if a neighbor is tabu 
+    takes constant time.
 
     Attributes:
-        _tabu_list: list of the states that are prohibited to access
-        _tabu_list_limit: maximum size of the tabu list; if it's overstated 
-            than the oldest state is drop out from the list
+        _tabu_tenure: number of the last visited tours that are prohibited to 
+            access; if None then it is 100 times the number of cities
+        _tabu_set: hashes of the tours that are prohibited to access
+        _tabu_queue: the same hashes in order they were added; if it's 
+            longer than the tabu tenure then the oldest hash is drop out
         For other attributes please refer BasicMethod class description.  
     """
     
     _name = "Tabu"
     _short_name = "Tabu"
     _type = "Metaheuristic"
-    _tabu_list = []
-    _tabu_list_limit = 1000
+    _options = ('tabu_tenure',)
+    _tabu_tenure = None
+    _tabu_set = None
+    _tabu_queue = None
     
-    def _in_tabu(self, state):
-        """Checks if the state in the tabu list"""
-        for tabu_state in self._tabu_list:
-            if tabu_state.__eq__(state):
-                return True
-        return False
+    def _in_tabu(self, value):
+        """Checks if the tour hash value in the tabu memory"""
+        return value in self._tabu_set
+        
+    def _add_tabu(self, value, tenure):
+        """Adds the tour hash value to the tabu memory"""
+        if value in self._tabu_set:
+            return
+        if len(self._tabu_queue)>=tenure:
+            self._tabu_set.discard(self._tabu_queue.popleft())
+        self._tabu_queue.append(value)
+        self._tabu_set.add(value)
     
     def run(self, input_state, stat=StatRecord()):
         """Runs Tabu strategy to solve the TSP problem.
@@ -64,9 +129,12 @@ class Tabu(BasicMethod):
         start_time = time()
         super(Tabu, self).run(input_state, stat)
         
-        self._tabu_list_limit = input_state.cities_num()*100
+        self._tabu_set, self._tabu_queue = set(), deque()
+        tenure = self._tabu_tenure or input_state.cities_num()*100
+        hasher = TourHash(input_state.cities_num(), self._random.randint(1<<31))
         ever_found_best_state = input_state.copy()
         state, value = input_state.copy(), self.calc_solution_cost(input_state)
+        state_hash = hasher.tour(state)
         stat.solution_cost = value
         while(True):
 #            print '{:.2f}'.format(value)
@@ -74,32 +142,176 @@ class Tabu(BasicMethod):
             if time()-start_time > self._run_time_limit:
                 return ever_found_best_state, "Run time limit has been reached"
                 
-            new_states = self.get_neighbors(state)
-            best_states, best_value = [], float('inf')
-            for new_state in new_states:
-                v = self.calc_solution_cost(new_state)
-                if v<=best_value and not self._in_tabu(new_state):
-                    if v<best_value:
-                        best_states = []
-                    best_states.append(new_state)
-                    best_value = v
+            moves_num = 0
+            best_moves, best_delta = [], float('inf')
+            for move in self.iter_moves(state):
+                moves_num += 1
+                delta = self.move_delta(state, move)
+                if delta<=best_delta + self._epsilon:
+                    move_hash = hasher.moved(state_hash, state, move)
+                    if self._in_tabu(move_hash):
+                        continue
+                    if delta<best_delta - self._epsilon:
+                        best_moves = []
+                    best_moves.append((move, move_hash, delta))
+                    best_delta = min(best_delta, delta)
                     
-            if not best_states:
+            if not best_moves:
                 break
             
-            state = best_states[randint(len(best_states))] 
-            value = best_value
+            move, state_hash, delta = best_moves[self._random.randint(len(best_moves))]
+            state.apply_move(move)
+            value = self.update_cost(state, value, delta, 
+                                     stat.overall_iterations + 1)
             self.send_state(state, value)
-            if len(self._tabu_list)==self._tabu_list_limit:
-                self._tabu_list.pop()
-            self._tabu_list.append(state)
+            self._add_tabu(state_hash, tenure)
 #            print state, value
-            if value<stat.solution_cost:
+            if value<stat.solution_cost - self._epsilon:
+                ever_found_best_state.copy_from(state)
+                stat.solution_cost = value
+                self.send_best_state(ever_found_best_state, value, stat)
+            
+            stat.overall_nodes_generated += moves_num
+            stat.overall_iterations += 1
+            stat.overall_run_time = time() - start_time
+            
+        return ever_found_best_state, "Local optimum is reached"
+
+class AttributeTabu(BasicMethod):
+    """Tabu metaheuristic method with attribute based tabu memory.
+    
+    Tabu memory stores the edges that have been removed by the recent moves: 
+    a removed edge can't be added back until its expiry iteration. Only O(N) 
+    edges are stored at once. A tabu move is still allowed if it leads to a 
+    tour that is better than the ever found best one (aspiration criterion).
+    
+    The method works best with the neighborhoods that contain all the moves 
+    of a kind (e.g. FullTwoOptNeighborhood).
+    
+    The class reimplements BasicMethod.run function.
+
+    Attributes:
+        _tabu_tenure: number of iterations an edge stays tabu; if None then 
+            it is a quarter of the number of cities, but not less than 5
+        _tabu_removed: expiry iterations of the recently removed edges
+        _tabu_queue: tuples (expiry, edge) in order they were added
+        For other attributes please refer BasicMethod class description.  
+    """
+    
+    _name = "Attribute tabu"
+    _short_name = "ATabu"
+    _type = "Metaheuristic"
+    _options = ('tabu_tenure',)
+    _tabu_tenure = None
+    _tabu_removed = None
+    _tabu_queue = None
+    
+    def _changed_edges(self, state, move):
+        """Returns the edges that are really changed by a move
+        
+        Returns:
+            Tuple (removed, added) of sets of the edges; each edge is a sorted 
+            pair of cities
+        """
+        if move[0]=='state':
+            removed, added = self._tour_edges(state), self._tour_edges(move[1])
+        else:
+            removed, added = [set((a, b) if a<b else (b, a) for a, b in edges)
+                              for edges in state.move_edges(move)]
+        return removed - added, added - removed
+        
+    def _tour_edges(self, state):
+        """Returns set of the edges of a tour that is described by state"""
+        cities = state._cities
+        return set((a, b) if a<b else (b, a) 
+                   for a, b in zip(cities, list(cities[1:]) + [cities[0]]))
+    
+    def _in_tabu(self, added, iteration):
+        """Checks if the move that adds the edges is prohibited"""
+        for edge in added:
+            if self._tabu_removed.get(edge, iteration)>iteration:
+                return True
+        return False
+        
+    def _add_tabu(self, removed, expiry):
+        """Makes the removed edges tabu until the expiry iteration"""
+        for edge in removed:
+            self._tabu_removed[edge] = expiry
+            self._tabu_queue.append((expiry, edge))
+                
+    def _expire_tabu(self, iteration):
+        """Drops out the edges which expiry iteration has come"""
+        queue = self._tabu_queue
+        while queue and queue[0][0]<=iteration:
+            expiry, edge = queue.popleft()
+            if self._tabu_removed.get(edge)==expiry:
+                del self._tabu_removed[edge]
+    
+    def run(self, input_state, stat=StatRecord()):
+        """Runs attribute based Tabu strategy to solve the TSP problem.
+        
+        Args:
+            Please refer to BasicMethod.run description
+            
+        Returns:
+            Please refer to BasicMethod.run description
+        """
+        start_time = time()
+        super(AttributeTabu, self).run(input_state, stat)
+        
+        self._tabu_removed = {}
+        self._tabu_queue = deque()
+        tenure = self._tabu_tenure or max(5, input_state.cities_num()//4)
+        ever_found_best_state = input_state.copy()
+        state, value = input_state.copy(), self.calc_solution_cost(input_state)
+        stat.solution_cost = value
+        iteration = 0
+        while(True):
+            self.send_current_cost(value, stat.solution_cost)
+            if time()-start_time > self._run_time_limit:
+                return ever_found_best_state, "Run time limit has been reached"
+                
+            moves_num, changing_moves_num = 0, 0
+            best_moves, best_delta = [], float('inf')
+            for move in self.iter_moves(state):
+                moves_num += 1
+                delta = self.move_delta(state, move)
+                if delta<=best_delta + self._epsilon:
+                    removed, added = self._changed_edges(state, move)
+                    if not removed:
+                        continue
+                    changing_moves_num += 1
+                    if (value + delta>=stat.solution_cost - self._epsilon and 
+                            self._in_tabu(added, iteration)):
+                        continue
+                    if delta<best_delta - self._epsilon:
+                        best_moves = []
+                    best_moves.append((move, removed, added, delta))
+                    best_delta = min(best_delta, delta)
+                    
+            stat.overall_nodes_generated += moves_num
+            stat.overall_iterations += 1
+            if not changing_moves_num:
+                # there are no moves or all of them leave the tour as is
+                break
+            iteration += 1
+            if not best_moves:
+                # all the moves are tabu, so the tabu memory gets older and 
+                # the neighborhood is tried again
+                self._expire_tabu(iteration)
+                continue
+            
+            move, removed, added, delta = best_moves[self._random.randint(len(best_moves))]
+            state.apply_move(move)
+            value = self.update_cost(state, value, delta, iteration)
+            self.send_state(state, value)
+            self._add_tabu(removed, iteration + tenure)
+            self._expire_tabu(iteration)
+            if value<stat.solution_cost - self._epsilon:
                 ever_found_best_state.copy_from(state)
                 stat.solution_cost = value
                 self.send_best_state(ever_found_best_state, value, stat)
             
-            stat.overall_nodes_generated += len(new_states)
             stat.overall_run_time = time() - start_time
             
-        return ever_found_best_state, "Local optimum is reached"
\ No newline at end of file
+        return ever_found_best_state, "Local optimum is reached"
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""Contains helpers for the TSP local search engines.
+
+There are next helpers:
+    neighbor_lists: builds candidate lists of the nearest cities
+    nearest_neighbor_tour: builds a tour with nearest neighbor heuristic
+    ArrayTour: tour with positions of the cities that supports fast 
+        reversals and exchanges of its parts
+The module does not contain methods, it is used by the methods modules.
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from numpy import arange, argpartition, argsort, array, concatenate, empty, inf, int32, ones
+
+def neighbor_lists(distance, k):
+    """Returns lists of the nearest cities for each city
+    
+    Args:
+        distance: distance matrix or DistanceOracle object
+        k: number of the nearest cities in each list
+        
+    Returns:
+        (N, k) array; row i contains k nearest cities to city i sorted by 
+        distance from it
+    """
+    cities_num = len(distance)
+    k = min(k, cities_num-1)
+    neighbors = empty((cities_num, k), dtype=int32)
+    for i in xrange(cities_num):
+        row = distance[i]
+        nearest = argpartition(row, k)[:k+1]
+        nearest = nearest[argsort(row[nearest], kind='mergesort')]
+        nearest = nearest[nearest!=i][:k]
+        neighbors[i] = nearest
+    return neighbors
+    
+def nearest_neighbor_tour(distance, neighbors, start=0):
+    """Builds a tour with nearest neighbor heuristic
+    
+    The nearest unvisited city is looked for in the neighbor lists first. 
+    The whole distance matrix row is scanned only if all neighbors are 
+    already visited.
+    
+    Args:
+        distance: distance matrix or DistanceOracle object
+        neighbors: neighbor lists, see neighbor_lists function
+        start: first city of the tour
+        
+    Returns:
+        List of the cities in the tour order
+    """
+    cities_num = len(distance)
+    unvisited = ones(cities_num, dtype=bool)
+    city = start
+    tour = [city]
+    unvisited[city] = False
+    for step in xrange(cities_num-1):
+        next_city = None
+        for candidate in neighbors[city]:
+            if unvisited[candidate]:
+                next_city = candidate
+                break
+        if next_city is None:
+            row = array(distance[city], dtype=float)
+            row[~unvisited] = inf
+            next_city = row.argmin()
+        city = int(next_city)
+        tour.append(city)
+        unvisited[city] = False
+    return tour
+    
+class ArrayTour(object):
+    """Tour that keeps positions of its cities
+    
+    The tour is stored in two arrays: order of the cities and position of 
+    each city in the order. So neighbors of a city in the tour are found in 
+    constant time, and a part of the tour is reversed with numpy operations.
+    
+    Attributes:
+        order: array of the cities in the tour order
+        pos: array of the positions; pos[c] is a position of city c in order
+        cities_num: number of cities
+    """
+    
+    def __init__(self, cities):
+        """Inits the tour
+        
+        Args:
+            cities: sequence of the cities in the tour order
+        """
+        self.order = array(cities, dtype=int32)
+        self.cities_num = len(self.order)
+        self.pos = empty(self.cities_num, dtype=int32)
+        self.pos[self.order] = arange(self.cities_num, dtype=int32)
+        
+    def succ(self, city):
+        """Returns the next city in the tour"""
+        return self.order[(self.pos[city]+1) % self.cities_num]
+        
+    def pred(self, city):
+        """Returns the previous city in the tour"""
+        return self.order[self.pos[city]-1]
+        
+    def between(self, a, b, c):
+        """Checks if city b is on the way from city a to city c"""
+        i, j, k = self.pos[a], self.pos[b], self.pos[c]
+        if i<=k:
+            return i<=j<=k
+        return j>=i or j<=k
+        
+    def reverse(self, first, last):
+        """Reverses the part of the tour from city first to city last
+        
+        The part goes forward from the first city and could wrap around the 
+        end of the order. If the part is longer than a half of the tour then 
+        the rest of the tour is reversed instead, which gives the same cycle.
+        
+        Args:
+            first: first city of the part
+            last: last city of the part
+        """
+        n = self.cities_num
+        i, j = self.pos[first], self.pos[last]
+        length = (j - i) % n + 1
+        if 2*length>n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        if length<2:
+            return
+        if i<=j:
+            positions = arange(i, j+1)
+            self.order[i:j+1] = self.order[i:j+1][::-1]
+        else:
+            positions = (arange(length) + i) % n
+            self.order[positions] = self.order[positions[::-1]]
+        self.pos[self.order[positions]] = positions
+        
+    def exchange(self, p1, p2, q1, q2):
+        """Replaces edges (p1, p2) and (q1, q2) with (p1, q1) and (p2, q2)
+        
+        The edges should have the same direction in the tour: either p2 and 
+        q2 follow p1 and q1, or p2 and q2 precede them.
+        """
+        if self.succ(p1)==p2:
+            self.reverse(p2, q1)
+        else:
+            self.reverse(p1, q2)
+            
+    def double_bridge(self, i, j, k):
+        """Makes double bridge move at positions i<j<k
+        
+        The tour parts A B C D that are split after positions i, j and k are 
+        reconnected as A C B D.
+        """
+        order = self.order
+        order[i+1:k+1] = concatenate((order[j+1:k+1], order[i+1:j+1]))
+        positions = arange(i+1, k+1)
+        self.pos[order[positions]] = positions
+        
+    def move_2opt(self, a, b, c, d):
+        """Replaces edges (a, b) and (c, d) with edges (a, c) and (b, d)
+        
+        Cities b and d should follow cities a and c in the tour.
+        """
+        self.reverse(b, c)
+        
+    def cities(self):
+        """Returns the tour as a list of cities"""
+        return self.order.tolist()
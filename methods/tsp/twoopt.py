@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""Contains 2-opt local search engine for the TSP problem.
+
+Class TwoOptSearch is inherited from BasicMethod. Unlike the hill climbing 
+with two-opt neighborhood it looks for improving moves around all cities of 
+the tour. The next speed-up techniques are used:
+    neighbor lists: only k nearest cities are checked as new neighbors of 
+        a city
+    don't-look bits: a city is checked again only if its tour neighbors 
+        were changed
+    first improvement: the first improving move is applied at once
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from basicmethod import BasicMethod
+from tour import ArrayTour, nearest_neighbor_tour, neighbor_lists
+from methods.statrecord import StatRecord
+from collections import deque
+from time import time
+
+class TwoOptSearch(BasicMethod):
+    """2-opt local search method implementation for the TSP problem.
+    
+    The class reimplements BasicMethod.run function. Neighborhoods are not 
+    used by the method.
+
+    Attributes:
+        _neighbors_num: number of the nearest cities in the neighbor lists
+        _construct: if True then the search starts from a nearest neighbor 
+            tour when it is shorter than the input tour
+        _report_interval: how often (in seconds) the current tour is sent to 
+            the main application
+        _epsilon: minimal gain of an improving move
+        For other attributes please refer to BasicMethod class description
+    """
+    
+    _name = "2-opt local search"
+    _short_name = "2-opt LS"
+    _type = "Local"
+    _uses_neighborhood = False
+    _neighbors_num = 10
+    _construct = True
+    _report_interval = 0.5
+    _epsilon = 1e-9
+    
+    def _improve_city(self, tour, a, neighbors):
+        """Looks for an improving 2-opt move that adds an edge to city a
+        
+        Both tour neighbors of city a are tried as the removed edge. The first 
+        found improving move is applied to the tour.
+        
+        Args:
+            tour: ArrayTour object
+            a: city
+            neighbors: neighbor lists
+            
+        Returns:
+            Tuple (gain, cities), where gain is a decrease of the tour 
+            distance and cities are the endpoints of the changed edges. 
+            (0, None) if there is no improving move.
+        """
+        d = self._distance_matrix
+        for forward in (True, False):
+            b = tour.succ(a) if forward else tour.pred(a)
+            d_ab = d[a, b]
+            for c in neighbors[a]:
+                g1 = d_ab - d[a, c]
+                if g1<=self._epsilon:
+                    break
+                e = tour.succ(c) if forward else tour.pred(c)
+                if c==b or e==a:
+                    continue
+                gain = g1 + d[c, e] - d[b, e]
+                if gain>self._epsilon:
+                    if forward:
+                        tour.move_2opt(a, b, c, e)
+                    else:
+                        tour.move_2opt(b, a, e, c)
+                    return gain, (a, b, c, e)
+        return 0, None
+    
+    def run(self, input_state, stat=StatRecord()):
+        """Runs 2-opt local search strategy to solve the TSP problem.
+        
+        Args:
+            Please refer to BasicMethod.run description
+            
+        Returns:
+            Please refer to BasicMethod.run description
+        """
+        start_time = time()
+        super(TwoOptSearch, self).run(input_state, stat)
+        
+        ever_found_best_state = input_state.copy()
+        state, value = input_state.copy(), self.calc_solution_cost(input_state)
+        stat.solution_cost = value
+        
+        neighbors = neighbor_lists(self._distance_matrix, self._neighbors_num)
+        if self._construct:
+            cities = nearest_neighbor_tour(self._distance_matrix, neighbors, 
+                                           state._cities[0])
+            state.set_cities(cities)
+            constructed_value = self.calc_solution_cost(state)
+            if constructed_value<value:
+                value = constructed_value
+            else:
+                state.copy_from(input_state)
+        tour = ArrayTour(state._cities)
+        
+        # the queue contains cities which don't-look bits are off
+        queue = deque(tour.cities())
+        in_queue = [True]*tour.cities_num
+        report_time = time()
+        message = "Local optimum is reached"
+        while queue:
+            if time()-start_time > self._run_time_limit:
+                message = "Run time limit has been reached"
+                break
+            a = queue.popleft()
+            in_queue[a] = False
+            gain, cities = self._improve_city(tour, a, neighbors)
+            stat.overall_nodes_generated += 1
+            stat.overall_iterations += 1
+            if not cities:
+                continue
+            value -= gain
+            for city in cities:
+                if not in_queue[city]:
+                    in_queue[city] = True
+                    queue.append(city)
+            self.send_current_cost(value, min(value, stat.solution_cost))
+            if time()-report_time > self._report_interval:
+                report_time = time()
+                state.set_cities(tour.cities())
+                self.send_state(state, value)
+            stat.overall_run_time = time() - start_time
+            
+        state.set_cities(tour.cities())
+        value = self.calc_solution_cost(state)
+        if value<stat.solution_cost:
+            ever_found_best_state.copy_from(state)
+            stat.solution_cost = value
+            self.send_state(state, value)
+            self.send_best_state(ever_found_best_state, value, stat)
+        stat.overall_run_time = time() - start_time
+        return ever_found_best_state, message
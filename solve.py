@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""Command-line runner of the TSP Problem Solver methods.
+
+Runs a search method for a TSP problem without the GUI. The script never 
+imports PyQt4, so it could be used on headless machines. The found tour and 
+the statistics record are written in JSON format.
+
+Examples:
+    python solve.py --list
+    python solve.py problem.tsp -m Tabu -n TwoOptNeighborhood -t 10
+    python solve.py --random 1000 -m SimulatedAnnealing -o cooling=geometric
+    python solve.py problem.tsp -m LinKernighan -t 60 --output result.json
+
+@author: Oleksii Molchanovskyi
+@organization: Kyiv Polytechnic Institute
+@country: Ukraine
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import json
+import sys
+from ast import literal_eval
+
+from tsp_board import TspBoard
+from methods.registry import get_registry
+from methods.statrecord import StatRecord
+from methods.tsp.state import TspState, TspArrayState
+from numpy.random import randint, seed as random_seed, RandomState
+
+def find_class(infos, name, kind):
+    """Returns a class by its name or short name (case insensitive)
+    
+    Args:
+        infos: list of ClassInfo objects of the registry
+        name: class name or short name
+        kind: kind of the class for the error message
+    """
+    for info in infos:
+        if name.lower() in (info.name.lower(), info.short_title.lower()):
+            return info.load()
+    raise SystemExit("Unknown %s: %s (run with --list to see all)" % (kind, name))
+
+def parse_option(text):
+    """Parses "name=value" option; the value is a Python literal or a string"""
+    name, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError("option should be name=value: %s" % text)
+    try:
+        value = literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return name, value
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description="Solves a TSP problem with one of the TSP Problem Solver methods.")
+    parser.add_argument('filename', nargs='?', help="TSP problem file")
+    parser.add_argument('-r', '--random', type=int, metavar='N',
+                        help="solve a random problem with N cities")
+    parser.add_argument('-m', '--method', help="method class name or short name")
+    parser.add_argument('-n', '--neighborhood', action='append', default=[],
+                        help="neighborhood class name or short name; could be "
+                        "repeated (default neighborhoods are used if omitted)")
+    parser.add_argument('-t', '--time-limit', type=float, default=60,
+                        help="run time limit in seconds (default: 60)")
+    parser.add_argument('-o', '--option', type=parse_option, action='append', 
+                        default=[], metavar='NAME=VALUE', 
+                        help="method option; could be repeated")
+    parser.add_argument('-s', '--seed', type=int, 
+                        help="random seed of the random problem, the initial "
+                        "tour and the run (a random one is reported if omitted)")
+    parser.add_argument('--array-state', action='store_true',
+                        help="store tours in numpy arrays (TspArrayState)")
+    parser.add_argument('--output', default='-',
+                        help="JSON result file (default: stdout)")
+    parser.add_argument('--list', action='store_true',
+                        help="list methods and neighborhoods and exit")
+    return parser.parse_args(args)
+
+def list_classes(registry):
+    """Prints methods and neighborhoods with their options"""
+    print "Methods:"
+    for info in registry.methods(enabled_only=True):
+        print "    %-28s %-10s %s" % (info.name, info.short_title, info.title)
+        if info.options:
+            print "        options: " + ", ".join(info.options)
+    print "Neighborhoods:"
+    for info in registry.neighborhoods():
+        print "    %-28s %-10s %s%s" % (info.name, info.short_title, info.title, 
+                                      info.default and " (default)" or "")
+
+def solve(args):
+    """Runs the method that is described by the command-line arguments
+    
+    Returns:
+        Dictionary with the result description
+    """
+    registry = get_registry()
+    if args.list:
+        list_classes(registry)
+        return None
+    if not args.method:
+        raise SystemExit("Method is not specified (use -m option)")
+    seed = args.seed if args.seed is not None else randint(1<<31)
+    random_seed(seed)
+        
+    board = TspBoard()
+    if args.random:
+        board.random(args.random)
+        instance = "random %d" % args.random
+    elif args.filename:
+        if not board.load_from_file(args.filename):
+            raise SystemExit("Cannot load problem file: %s" % args.filename)
+        instance = args.filename
+    else:
+        raise SystemExit("Problem file or --random option is required")
+        
+    methods = registry.methods(enabled_only=True)
+    neighborhoods = registry.neighborhoods()
+    method_class = find_class(methods, args.method, "method")
+    if args.neighborhood:
+        neighborhood_classes = [find_class(neighborhoods, name, "neighborhood") 
+                                for name in args.neighborhood]
+    else:
+        neighborhood_classes = [info.load() for info in neighborhoods if info.default]
+    # the matrix is copied to shared memory only for the methods that pass 
+    # it to their own processes
+    if method_class._uses_processes:
+        distance_matrix = board.shared_distance_matrix()
+    else:
+        distance_matrix = board.distance_matrix()
+    try:
+        method = method_class(neighborhood=[neighborhood() for neighborhood in neighborhood_classes], 
+                              time_limit=args.time_limit, 
+                              args=[distance_matrix], 
+                              options=dict([('seed', seed)] + args.option))
+    except ValueError as e:
+        raise SystemExit(str(e))
+        
+    state_class = TspArrayState if args.array_state else TspState
+    state = state_class(board.cities_num(), generator=RandomState(seed))
+    stat = StatRecord()
+    result_state, message = method.run(state, stat)
+    return {'instance': instance,
+            'cities_num': board.cities_num(),
+            'method': method_class.__name__,
+            'neighborhoods': [neighborhood.__name__ for neighborhood in neighborhood_classes],
+            'time_limit': args.time_limit,
+            'options': method.options(),
+            'seed': stat.seed,
+            'message': message,
+            'statistics': stat.to_dict(),
+            'tour': [int(city) for city in result_state._cities]}
+
+def main(args=None):
+    args = parse_args(args)
+    result = solve(args)
+    if result is None:
+        return
+    if args.output=='-':
+        json.dump(result, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=1, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
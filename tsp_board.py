@@ -20,35 +20,153 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from numpy.random import random
-from numpy import sqrt
-from copy import deepcopy
+from numpy import array, asarray, dtype, float64, load, save, sqrt, subtract, zeros
+from collections import OrderedDict
+from copy import copy
+from hashlib import sha1
+from methods.sharedmatrix import SharedMatrix
+from tempfile import mkstemp
+import os
+import re
 
 MAP_SIZE = 1000
 
+class DistanceOracle(object):
+    """Computes distances between cities on demand.
+    
+    The oracle is used instead of a dense distance matrix for instances that 
+    are too large to keep NxN matrix in memory. It supports the same indexing 
+    as the matrix:
+        oracle[i][j], oracle[i] - rows of the matrix; recently used rows are 
+            kept in a bounded LRU cache
+        oracle[i, j] - distance between cities @i and @j; @i and @j could be 
+            also arrays of city numbers, then an array of distances is 
+            returned
+    
+    Attributes:
+        _cities: (N, 2) array of cities coordinates
+        _cache: ordered dictionary of cached rows, the oldest first
+        _cache_bytes: memory budget of the cache (in bytes)
+        _cache_rows: maximum number of cached rows; it's derived from the 
+            memory budget and the row size
+    """
+    _cities = None
+    _cache = None
+    _cache_bytes = 64 << 20
+    _cache_rows = 1
+    
+    def __init__(self, cities, dtype=float64, cache_bytes=None):
+        """Inits the oracle
+        
+        Args:
+            cities: (N, 2) array of cities coordinates
+            dtype: float type of the calculated distances
+            cache_bytes: memory budget of the cache (in bytes)
+        """
+        self._cities = asarray(cities, dtype=dtype)
+        self._cache = OrderedDict()
+        if cache_bytes:
+            self._cache_bytes = cache_bytes
+        row_bytes = self._cities.dtype.itemsize*max(1, len(self._cities))
+        self._cache_rows = max(1, self._cache_bytes // row_bytes)
+        
+    def __len__(self):
+        return len(self._cities)
+        
+    @property
+    def shape(self):
+        return (len(self._cities), len(self._cities))
+        
+    @property
+    def dtype(self):
+        return self._cities.dtype
+        
+    def row(self, i):
+        """Returns distances from city @i to all cities"""
+        row = self._cache.pop(i, None)
+        if row is None:
+            delta = self._cities - self._cities[i]
+            row = sqrt((delta*delta).sum(axis=1))
+            if len(self._cache)>=self._cache_rows:
+                self._cache.popitem(last=False)
+        self._cache[i] = row
+        return row
+        
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            delta = self._cities[i] - self._cities[j]
+            return sqrt((delta*delta).sum(axis=-1))
+        return self.row(key)
+        
+    def __getstate__(self):
+        """Drops the cache when the oracle is pickled"""
+        state = self.__dict__.copy()
+        state['_cache'] = OrderedDict()
+        return state
+
 class TspBoard(object):
+    """Stores TSP cities and the distance matrix between them.
+    
+    Attributes:
+        _cities_num: number of cities
+        _cities: (N, 2) array of cities coordinates
+        _distance: NxN distance matrix; each cell [i,j] stores distance 
+            from city @i to city @j
+            or DistanceOracle object for large instances
+        _shared_distance: SharedMatrix handle of the distance matrix
+        _dtype: float type of the distance matrix (float32 or float64)
+        _dense_limit: maximum number of cities for which the dense distance 
+            matrix is built; DistanceOracle is used for larger instances
+        _use_cache: if True then the distance matrix of a loaded instance is 
+            saved to a .npy file next to the instance file and memory-mapped 
+            on later loads
+        _edges: bounding box of the cities
+    """
     _cities_num = 0
-    _cities = []
-    _distance = []
+    _cities = zeros((0, 2))
+    _distance = zeros((0, 0))
+    _shared_distance = None
+    _dtype = float64
+    _dense_limit = 20000
+    _use_cache = True
     _edges = {}
     
+    def __init__(self, dtype=None, dense_limit=None, use_cache=None):
+        """Inits the board
+        
+        Args:
+            dtype: float type of the distance matrix; float64 by default
+            dense_limit: maximum number of cities for the dense matrix
+            use_cache: if the distance matrix cache files are used
+        """
+        if dtype:
+            self._dtype = dtype
+        if dense_limit is not None:
+            self._dense_limit = dense_limit
+        if use_cache is not None:
+            self._use_cache = use_cache
+    
     def random(self, cities_num):
-        self._cities = []
         self._cities_num = cities_num
-        for c in range(cities_num):
-            self._cities.append((MAP_SIZE*random(),MAP_SIZE*random()))
+        self._cities = MAP_SIZE*random((cities_num, 2))
         self._calc_distancies()
         self._calc_edges()
         
     def load_from_file(self, filename):
-        self._cities = []
+        cities = []
         self._cities_num = 0
         try:
             with open(filename,'r') as f:
                 self._cities_num = int(f.readline())
                 for line in f:
                     x, y = tuple([float(x) for x in line.split()])
-                    self._cities.append((x, y))
-            self._calc_distancies()
+                    cities.append((x, y))
+            self._cities = array(cities, dtype=float64).reshape((-1, 2))
+            if self._use_cache and self._cities_num<=self._dense_limit:
+                self._load_distancies(self._cache_filename(filename))
+            else:
+                self._calc_distancies()
             self._calc_edges()
         except IOError:
             # Cannot open file
@@ -59,25 +177,120 @@ class TspBoard(object):
         try:
             with open(filename,'w') as f:
                 f.write(str(self._cities_num))
-                map(lambda x: f.write("\n%.3f %.3f"%x), self._cities)
+                map(lambda x: f.write("\n%.3f %.3f"%tuple(x)), self._cities)
         except IOError:
             # Cannot open file
             return False
         return True                
             
     def _calc_distancies(self):
-        self._distance = [[0 for x in range(self._cities_num)] for x in range(self._cities_num)]
-        for i in range(self._cities_num-1):
-            for j in range(i+1, self._cities_num):
-                if i!=j:
-                    self._distance[i][j] = self._distance[j][i] = sqrt((self._cities[i][0]-self._cities[j][0])**2 + (self._cities[i][1]-self._cities[j][1])**2)
+        """Calculates the whole distance matrix with numpy broadcasting
+        
+        Squared coordinate differences are accumulated in place, so at most 
+        two NxN arrays of self._dtype are allocated at a time. If there are 
+        more than self._dense_limit cities the matrix is replaced with 
+        DistanceOracle.
+        
+        The shared copy of the previous matrix is dropped, and its memory is 
+        freed once the runs that use it are over.
+        """
+        self._shared_distance = None
+        if self._cities_num>self._dense_limit:
+            self._distance = DistanceOracle(self._cities, self._dtype)
+            return
+        cities = self._cities.astype(self._dtype)
+        x, y = cities[:, 0], cities[:, 1]
+        distance = subtract.outer(x, x)
+        distance *= distance
+        delta_y = subtract.outer(y, y)
+        delta_y *= delta_y
+        distance += delta_y
+        del delta_y
+        sqrt(distance, out=distance)
+        self._distance = distance
                     
+    def _cache_filename(self, filename):
+        """Returns a distance matrix cache file name for the instance file
+        
+        The name contains a hash of the cities coordinates and the matrix 
+        dtype, so the cache becomes stale once the instance is changed.
+        """
+        digest = sha1(dtype(self._dtype).str)
+        digest.update(self._cities.tobytes())
+        return '%s.%s.npy' % (filename, digest.hexdigest()[:16])
+        
+    def _load_distancies(self, cache_filename):
+        """Memory-maps the distance matrix from the cache file
+        
+        If there is no valid cache file the matrix is calculated and saved. 
+        The saved matrix is memory-mapped as well, so solver processes share 
+        its pages. If the cache could not be written the calculated matrix 
+        is kept in memory.
+        
+        The matrix is written to a unique temporary file that is renamed to 
+        the cache file, so processes that load the same instance at once 
+        don't overwrite each other's files. Cache files of the older versions 
+        of the instance file are removed (see _remove_stale_caches).
+        """
+        shape = (self._cities_num, self._cities_num)
+        self._shared_distance = None
+        try:
+            self._distance = load(cache_filename, mmap_mode='r')
+            if self._distance.shape==shape and self._distance.dtype==self._dtype:
+                return
+        except (IOError, ValueError):
+            pass
+        self._calc_distancies()
+        cache_dir, cache_name = os.path.split(os.path.abspath(cache_filename))
+        tmp_filename = None
+        try:
+            fd, tmp_filename = mkstemp(prefix=cache_name + '.', suffix='.tmp', 
+                                       dir=cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                save(f, self._distance)
+            if os.name=='nt' and os.path.exists(cache_filename):
+                os.remove(cache_filename)
+            os.rename(tmp_filename, cache_filename)
+            tmp_filename = None
+            self._distance = load(cache_filename, mmap_mode='r')
+        except (IOError, OSError):
+            # Cannot write cache file
+            if tmp_filename:
+                try:
+                    os.remove(tmp_filename)
+                except OSError:
+                    pass
+            return
+        self._remove_stale_caches(cache_filename)
+        
+    def _remove_stale_caches(self, cache_filename):
+        """Removes cache files of the older versions of the instance file
+        
+        A cache file that is older than the instance file was calculated 
+        for its previous cities, so it can't be valid any more. Caches of 
+        the current cities with other settings (e.g. dtype) are kept.
+        """
+        cache_dir, cache_name = os.path.split(os.path.abspath(cache_filename))
+        instance_name = cache_name[:-len('.0123456789abcdef.npy')]
+        try:
+            instance_time = os.path.getmtime(os.path.join(cache_dir, instance_name))
+        except OSError:
+            return
+        stale = re.compile(re.escape(instance_name) + r'\.[0-9a-f]{16}\.npy$')
+        for name in os.listdir(cache_dir):
+            if name==cache_name or not stale.match(name):
+                continue
+            path = os.path.join(cache_dir, name)
+            try:
+                if os.path.getmtime(path)<instance_time:
+                    os.remove(path)
+            except OSError:
+                pass
+        
     def _calc_edges(self):
         self._edges = {}
-        self._edges['max_x'] = max([x[0] for x in self._cities])
-        self._edges['max_y'] = max([x[1] for x in self._cities])
-        self._edges['min_x'] = min([x[0] for x in self._cities])
-        self._edges['min_y'] = min([x[1] for x in self._cities])        
+        self._edges['max_x'], self._edges['max_y'] = self._cities.max(axis=0)
+        self._edges['min_x'], self._edges['min_y'] = self._cities.min(axis=0)
         
     def cities_num(self):
         return self._cities_num
@@ -88,6 +301,22 @@ class TspBoard(object):
     def distance_matrix(self):
         return self._distance
         
+    def shared_distance_matrix(self):
+        """Returns the distance matrix that could be shared between processes
+        
+        The matrix is placed to shared memory at the first call, and the board 
+        uses the shared copy afterwards. DistanceOracle is returned as it is.
+        
+        Returns:
+            SharedMatrix object or DistanceOracle object
+        """
+        if isinstance(self._distance, DistanceOracle):
+            return self._distance
+        if self._shared_distance is None:
+            self._shared_distance = SharedMatrix(self._distance)
+            self._distance = self._shared_distance.array()
+        return self._shared_distance
+        
     def max_x(self):
         return self._edges['max_x']
         
@@ -101,4 +330,11 @@ class TspBoard(object):
         return self._edges['min_y']
         
     def copy(self):
-        return deepcopy(self)
\ No newline at end of file
+        """Returns a copy of the board
+        
+        Cities and distance matrix are never changed in place, so the copy 
+        shares them with this board instead of duplicating the NxN matrix.
+        """
+        board = copy(self)
+        board._edges = self._edges.copy()
+        return board
\ No newline at end of file